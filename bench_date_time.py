@@ -0,0 +1,19 @@
+from loading import parse_date_time
+import timeit
+import numpy as np
+import pandas as pd
+
+
+N_ROWS = 50_000
+
+date_time = pd.Series(
+    (pd.Timestamp("2021-01-22") + pd.to_timedelta(np.arange(N_ROWS), unit="s")).strftime("%m/%d/%Y %H:%M:%S"))
+schema = ("Date_Time", "Test_Time(s)")
+parse_date_time(date_time.head(), schema)  # detect and cache the format once
+
+inference = min(timeit.repeat(lambda: pd.to_datetime(date_time, utc=True), number=1, repeat=3))
+explicit = min(timeit.repeat(lambda: parse_date_time(date_time, schema), number=1, repeat=3))
+assert parse_date_time(date_time, schema).equals(pd.to_datetime(date_time, utc=True))
+
+print(f"format inference: {inference:.3f} s for {N_ROWS} rows")
+print(f"cached format:    {explicit:.3f} s for {N_ROWS} rows ({inference / explicit:.1f}x faster)")
@@ -0,0 +1,246 @@
+from contextlib import contextmanager
+from pandas import DataFrame
+from typing import Callable, Dict, Iterator, List, Optional
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None  # type: ignore
+
+from loading import prepare_frame
+
+
+SAMPLE_BYTES = 1 << 20
+
+
+def read_export(path: str) -> DataFrame:
+    """Reads a complete cycler export and parses its date column.
+
+    Args:
+        path (str): path to the CSV export
+
+    Returns:
+        DataFrame: DataFrame with a DateTime index
+    """
+    return prepare_frame(pd.read_csv(path))  # type: ignore
+
+
+def read_parquet_schema(path: str, columns: Optional[List[str]] = None) -> DataFrame:
+    """Returns the columns and index of a Parquet file written by pandas
+    as an empty DataFrame, reading only the file footer.
+
+    Args:
+        path (str): path to the Parquet file
+        columns (List[str], optional): only include these columns
+
+    Returns:
+        DataFrame: DataFrame without rows
+    """
+    df: DataFrame = pq.read_schema(path).empty_table().to_pandas()
+    return df if columns is None else df[columns]
+
+
+def get_file_fingerprint(path: str) -> str:
+    """Returns a fingerprint of a file built from its absolute path, size,
+    modification time and a hash of its content. To stay cheap for multi-GB
+    exports, only the first and last megabyte of the content are hashed;
+    appended or rewritten files also change size or modification time.
+
+    Args:
+        path (str): path to the file
+
+    Returns:
+        str: hex digest identifying this version of the file
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    digest.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|".encode())
+    with open(path, "rb") as file:
+        digest.update(file.read(SAMPLE_BYTES))
+        if stat.st_size > 2 * SAMPLE_BYTES:
+            file.seek(-SAMPLE_BYTES, os.SEEK_END)
+        digest.update(file.read(SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+class ExportCache:
+    """On-disk cache of parsed cycler exports, stored as Parquet files.
+
+    Entries are keyed by get_file_fingerprint(), so a changed export is
+    parsed again. When the cache grows beyond max_bytes, the least recently
+    used entries are removed. The manifest is locked while it is updated, so
+    several processes can share one cache directory.
+
+    Args:
+        cache_dir (str): directory holding the cached exports
+        max_bytes (int): size cap for all cached files together
+        loader (Callable[[str], DataFrame]): function parsing an export
+            on a cache miss
+    """
+
+    MANIFEST = "manifest.json"
+    LOCK = "manifest.lock"
+
+    def __init__(
+            self,
+            cache_dir: str,
+            max_bytes: int = 10 * 1024**3,
+            loader: Callable[[str], DataFrame] = read_export) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.loader = loader
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _read_manifest(self) -> Dict[str, Dict[str, float]]:
+        try:
+            with open(os.path.join(self.cache_dir, self.MANIFEST)) as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_manifest(self, manifest: Dict[str, Dict[str, float]]) -> None:
+        path = os.path.join(self.cache_dir, self.MANIFEST)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(manifest, file)
+        os.replace(tmp_path, path)
+
+    @contextmanager
+    def _update_manifest(self) -> Iterator[Dict[str, Dict[str, float]]]:
+        """Yields the manifest for a read-modify-write while holding an
+        exclusive lock, and writes it back afterwards."""
+        with open(os.path.join(self.cache_dir, self.LOCK), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                manifest = self._read_manifest()
+                yield manifest
+                self._write_manifest(manifest)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def _get_key(self, path: str, variant: str) -> str:
+        key = get_file_fingerprint(path)
+        return f"{key}-{variant}" if variant else key
+
+    def get(
+            self,
+            path: str,
+            columns: Optional[List[str]] = None,
+            variant: str = "") -> Optional[DataFrame]:
+        """Returns the cached version of an export or None on a cache miss.
+
+        Args:
+            path (str): path to the export
+            columns (List[str], optional): only read these columns
+            variant (str): distinguishes several DataFrames parsed from the
+                same file, e.g. the sheets of an Excel export
+
+        Returns:
+            DataFrame: cached DataFrame or None
+        """
+        key = self._get_key(path, variant)
+        entry_path = self._entry_path(key)
+        if not os.path.exists(entry_path):
+            return None
+        df = pd.read_parquet(entry_path, columns=columns)  # type: ignore
+        with self._update_manifest() as manifest:
+            manifest.setdefault(key, {"size": os.path.getsize(entry_path)})
+            manifest[key]["last_access"] = time.time()
+        return df
+
+    def get_schema(
+            self,
+            path: str,
+            columns: Optional[List[str]] = None,
+            variant: str = "") -> Optional[DataFrame]:
+        """Returns the columns and index of a cached export without reading
+        any rows, or None on a cache miss.
+
+        Args:
+            path (str): path to the export
+            columns (List[str], optional): only include these columns
+            variant (str): distinguishes several DataFrames parsed from the
+                same file, e.g. the sheets of an Excel export
+
+        Returns:
+            DataFrame: cached DataFrame without rows or None
+        """
+        entry_path = self._entry_path(self._get_key(path, variant))
+        if not os.path.exists(entry_path):
+            return None
+        return read_parquet_schema(entry_path, columns)
+
+    def put(self, path: str, df: DataFrame, variant: str = "") -> None:
+        """Stores a parsed export in the cache and evicts old entries if
+        the size cap is exceeded.
+
+        Args:
+            path (str): path to the export the DataFrame was parsed from
+            df (DataFrame): parsed export
+            variant (str): distinguishes several DataFrames parsed from the
+                same file, e.g. the sheets of an Excel export
+        """
+        key = self._get_key(path, variant)
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path)  # type: ignore
+        os.replace(tmp_path, entry_path)
+        with self._update_manifest() as manifest:
+            manifest[key] = {"size": os.path.getsize(entry_path),
+                             "last_access": time.time()}
+        self.evict()
+
+    def load(self, path: str) -> DataFrame:
+        """Returns a parsed export, from the cache if possible. On a miss,
+        the export is parsed with the loader and added to the cache.
+
+        Args:
+            path (str): path to the export
+
+        Returns:
+            DataFrame: parsed export with a DateTime index
+        """
+        df = self.get(path)
+        if df is None:
+            df = self.loader(path)
+            self.put(path, df)
+        return df
+
+    def size(self) -> int:
+        """Returns the total size of all cached files in bytes."""
+        return int(sum(entry["size"] for entry in self._read_manifest().values()))
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the cache is
+        within its size cap."""
+        with self._update_manifest() as manifest:
+            total = sum(entry["size"] for entry in manifest.values())
+            for key in sorted(manifest, key=lambda k: manifest[k].get("last_access", 0)):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self._entry_path(key))
+                except FileNotFoundError:
+                    pass
+                total -= manifest.pop(key)["size"]
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        with self._update_manifest() as manifest:
+            for key in manifest:
+                try:
+                    os.remove(self._entry_path(key))
+                except FileNotFoundError:
+                    pass
+            manifest.clear()
@@ -0,0 +1,263 @@
+from pandas import DataFrame
+from typing import Any, Callable, List, Optional
+import os
+import sqlite3
+import pandas as pd
+
+from cache import get_file_fingerprint, read_export
+from loading import STEP_INDEX_COL, get_interval_bounds
+from merging import get_time_keys
+from steps import get_step_runs
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL REFERENCES channels(id),
+    path TEXT NOT NULL UNIQUE,
+    fingerprint TEXT,
+    start_time INTEGER,
+    stop_time INTEGER,
+    n_rows INTEGER
+);
+CREATE TABLE IF NOT EXISTS steps (
+    id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL REFERENCES channels(id),
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    step_index INTEGER NOT NULL,
+    occurrence INTEGER NOT NULL,
+    start_time INTEGER NOT NULL,
+    stop_time INTEGER NOT NULL,
+    start_row INTEGER NOT NULL,
+    stop_row INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS steps_channel_step_start
+    ON steps (channel_id, step_index, start_time);
+CREATE INDEX IF NOT EXISTS steps_step_start
+    ON steps (step_index, start_time);
+CREATE UNIQUE INDEX IF NOT EXISTS steps_file_run
+    ON steps (file_id, step_index, occurrence);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    step_id INTEGER NOT NULL REFERENCES steps(id) ON DELETE CASCADE,
+    cell TEXT NOT NULL,
+    soc REAL,
+    capacity REAL,
+    cutoff_voltage REAL
+);
+CREATE INDEX IF NOT EXISTS results_step ON results (step_id);
+"""
+
+TIME_COLUMNS = ["start_time", "stop_time"]
+
+
+class Catalog:
+    """Local SQLite catalog of channels, exports, step runs and computed
+    capacity results. Step runs are indexed by (channel, step index, start
+    time), so finding e.g. all step-13 discharges of a quarter is an
+    indexed query instead of a scan over the raw data.
+
+    Times are stored as int64 UTC nanoseconds and returned as timestamps.
+
+    Args:
+        path (str): path to the SQLite database, ":memory:" for a
+            temporary catalog
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _query(self, sql: str, params: List[Any]) -> DataFrame:
+        df = pd.read_sql_query(sql, self.connection, params=params)  # type: ignore
+        for col in TIME_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], utc=True)  # type: ignore
+        return df
+
+    def add_channel(self, name: str) -> int:
+        """Adds a channel if it does not exist yet.
+
+        Args:
+            name (str): channel name
+
+        Returns:
+            int: id of the channel
+        """
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO channels (name) VALUES (?)", (name,))
+        row = self.connection.execute("SELECT id FROM channels WHERE name = ?", (name,)).fetchone()
+        return int(row[0])
+
+    def add_file(
+            self,
+            channel: str,
+            path: str,
+            df: Optional[DataFrame] = None,
+            step_col_name: str = STEP_INDEX_COL) -> int:
+        """Adds an export and all its step runs to the catalog. An export
+        that is already in the catalog is updated in place, e.g. after it
+        grew: step runs that start at the same row as before keep their id
+        and their results, only step runs that changed their start or no
+        longer exist are replaced together with their results.
+
+        Args:
+            channel (str): channel the export belongs to
+            path (str): path to the export
+            df (DataFrame, optional): parsed export, read with read_export()
+                if not given
+            step_col_name (str): name of the step index column
+
+        Returns:
+            int: id of the file
+        """
+        if df is None:
+            df = read_export(path)
+        channel_id = self.add_channel(channel)
+        keys = get_time_keys(df)
+        runs = get_step_runs(df, step_col_name)
+        path = os.path.abspath(path)
+        new_runs = {(run[0], run[1]): run for run in (
+            tuple(map(int, run)) for run in runs[
+                ["step_index", "occurrence", "start_time", "stop_time", "start_row", "stop_row"]
+            ].itertuples(index=False))}
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO files (channel_id, path, fingerprint, start_time, stop_time, n_rows) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (path) DO UPDATE SET "
+                "channel_id = excluded.channel_id, fingerprint = excluded.fingerprint, "
+                "start_time = excluded.start_time, stop_time = excluded.stop_time, "
+                "n_rows = excluded.n_rows",
+                (channel_id, path, get_file_fingerprint(path),
+                 int(keys[0]) if len(keys) else None, int(keys[-1]) if len(keys) else None, len(df)))
+            file_id = int(self.connection.execute(
+                "SELECT id FROM files WHERE path = ?", (path,)).fetchone()[0])
+
+            # * step runs are identified by their step index and occurrence within the file
+            updated, removed = [], []
+            for step_id, step_index, occurrence, start_row in self.connection.execute(
+                    "SELECT id, step_index, occurrence, start_row FROM steps WHERE file_id = ?",
+                    (file_id,)).fetchall():
+                run = new_runs.get((step_index, occurrence))
+                if run is not None and run[4] == start_row:
+                    updated.append((channel_id, run[2], run[3], run[5], step_id))
+                    del new_runs[(step_index, occurrence)]
+                else:
+                    removed.append((step_id,))
+            self.connection.executemany("DELETE FROM steps WHERE id = ?", removed)
+            self.connection.executemany(
+                "UPDATE steps SET channel_id = ?, start_time = ?, stop_time = ?, stop_row = ? "
+                "WHERE id = ?", updated)
+            self.connection.executemany(
+                "INSERT INTO steps (channel_id, file_id, step_index, occurrence, start_time, "
+                "stop_time, start_row, stop_row) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(channel_id, file_id, *run) for run in new_runs.values()])
+        return file_id
+
+    def find_steps(
+            self,
+            channel: Optional[str] = None,
+            step_index: Optional[int] = None,
+            start_date: Optional[str] = None,
+            stop_date: Optional[str] = None) -> DataFrame:
+        """Finds the step runs starting within a time interval.
+
+        Args:
+            channel (str, optional): channel name
+            step_index (int, optional): Step Index Number
+            start_date (str, optional): start date for interval
+            stop_date (str, optional): stop date for interval
+
+        Returns:
+            DataFrame: matching step runs with their channel and file path
+        """
+        start, stop = get_interval_bounds(start_date, stop_date)
+        conditions: List[str] = []
+        params: List[Any] = []
+        for condition, value in (("channels.name = ?", channel),
+                                 ("steps.step_index = ?", step_index),
+                                 ("steps.start_time >= ?", None if start is None else start.value),
+                                 ("steps.start_time <= ?", None if stop is None else stop.value)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(
+            "SELECT steps.id, channels.name AS channel, files.path, steps.step_index, "
+            "steps.occurrence, steps.start_time, steps.stop_time, steps.start_row, steps.stop_row "
+            "FROM steps JOIN channels ON channels.id = steps.channel_id "
+            f"JOIN files ON files.id = steps.file_id {where} "
+            "ORDER BY channels.name, steps.start_time", params)
+
+    def load_step(self, step_id: int, loader: Callable[[str], DataFrame] = read_export) -> DataFrame:
+        """Loads the data of a step run by slicing its rows from the export.
+
+        Args:
+            step_id (int): id of the step run
+            loader (Callable[[str], DataFrame]): function reading the export,
+                e.g. ExportCache.load
+
+        Returns:
+            DataFrame: data of the step run
+        """
+        path, start_row, stop_row = self.connection.execute(
+            "SELECT files.path, steps.start_row, steps.stop_row FROM steps "
+            "JOIN files ON files.id = steps.file_id WHERE steps.id = ?", (step_id,)).fetchone()
+        return loader(path).iloc[start_row:stop_row]
+
+    def add_result(
+            self,
+            step_id: int,
+            soc_df: DataFrame,
+            cutoff_voltage: Optional[float] = None) -> None:
+        """Stores the result of get_final_SOC() for a step run.
+
+        Args:
+            step_id (int): id of the step run
+            soc_df (DataFrame): output of get_final_SOC()
+            cutoff_voltage (float, optional): cutoff voltage the capacity
+                test was trimmed to
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO results (step_id, cell, soc, capacity, cutoff_voltage) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(step_id, str(cell), float(row["SOC (%)"]), float(row["Capacity (Ah)"]),
+                  cutoff_voltage) for cell, row in soc_df.iterrows()])
+
+    def get_results(
+            self,
+            channel: Optional[str] = None,
+            step_index: Optional[int] = None) -> DataFrame:
+        """Returns the stored results together with their step runs.
+
+        Args:
+            channel (str, optional): channel name
+            step_index (int, optional): Step Index Number
+
+        Returns:
+            DataFrame: one row per cell and step run
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        if channel is not None:
+            conditions.append("channels.name = ?")
+            params.append(channel)
+        if step_index is not None:
+            conditions.append("steps.step_index = ?")
+            params.append(step_index)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(
+            "SELECT channels.name AS channel, steps.id AS step_id, steps.step_index, "
+            "steps.start_time, steps.stop_time, results.cell, results.soc, results.capacity, "
+            "results.cutoff_voltage FROM results JOIN steps ON steps.id = results.step_id "
+            f"JOIN channels ON channels.id = steps.channel_id {where} "
+            "ORDER BY channels.name, steps.start_time, results.cell", params)
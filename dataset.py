@@ -0,0 +1,218 @@
+from pandas import DataFrame, DatetimeIndex
+from typing import Any, Dict, List, Optional
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from cache import read_parquet_schema
+from loading import STEP_INDEX_COL, get_interval_bounds
+from main import isolate_step_index, isolate_timeinterval
+from merging import get_time_keys, merge_exports_deduplicated
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+def _read_manifest(root: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(root, MANIFEST_FILE)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {"channels": {}}
+
+
+def _write_manifest(root: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(root, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(manifest, file, indent=1)
+    os.replace(f"{path}.tmp", path)
+
+
+def write_partitioned_dataset(
+        df: DataFrame,
+        root: str,
+        channel: str,
+        freq: str = "M",
+        time_tolerance: str = "0s",
+        value_atol: float = 0.0) -> int:
+    """Writes a battery time series into a dataset partitioned by channel and
+    by month ("M") or day ("D"). Each partition is a Parquet file, and the
+    manifest records its first and last timestamp. Rows falling into an
+    existing partition are merged with it with merge_exports_deduplicated(),
+    so a channel history can be extended export by export, and writing an
+    overlapping or the same export again does not duplicate its samples.
+
+    Args:
+        df (DataFrame): battery time series data with a DateTime index
+        root (str): root directory of the dataset
+        channel (str): channel name, e.g. "Channel_3"
+        freq (str): partition size, "M" for months or "D" for days
+        time_tolerance (str): largest time difference of near-duplicates
+            in the overlap with existing partitions
+        value_atol (float): largest absolute difference of the values of
+            near-duplicates
+
+    Returns:
+        int: number of duplicated samples that were not written
+    """
+    if freq not in ("M", "D"):
+        raise ValueError(f"Unsupported partition frequency: {freq}")
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")  # type: ignore
+    channel_dir = os.path.join(root, channel)
+    os.makedirs(channel_dir, exist_ok=True)
+    manifest = _read_manifest(root)
+    partitions: Dict[str, Dict[str, Any]] = manifest["channels"].setdefault(channel, {})
+
+    index: DatetimeIndex = df.index  # type: ignore
+    periods = index.tz_convert(None).to_period(freq).astype(str) if index.tz is not None \
+        else index.to_period(freq).astype(str)
+    boundaries = np.flatnonzero(periods[1:] != periods[:-1]) + 1
+    total_removed = 0
+    for start_row, stop_row in zip(np.r_[0, boundaries], np.r_[boundaries, len(df)]):
+        name = str(periods[start_row])
+        part_df = df.iloc[start_row:stop_row]
+        file_name = f"{name}.parquet"
+        file_path = os.path.join(channel_dir, file_name)
+        if name in partitions:
+            part_df, removed = merge_exports_deduplicated(
+                [pd.read_parquet(file_path), part_df], None, time_tolerance, value_atol)  # type: ignore
+            total_removed += removed
+        part_df.to_parquet(file_path)  # type: ignore
+        keys = get_time_keys(part_df)
+        partitions[name] = {"file": os.path.join(channel, file_name),
+                            "min": int(keys[0]), "max": int(keys[-1]),
+                            "rows": len(part_df)}
+    _write_manifest(root, manifest)
+    return total_removed
+
+
+class PartitionedDataset:
+    """Multi-year channel history written by write_partitioned_dataset().
+    Queries only open the partitions that overlap the requested time interval.
+
+    Args:
+        root (str): root directory of the dataset
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.manifest = _read_manifest(root)
+
+    @property
+    def channels(self) -> List[str]:
+        return list(self.manifest["channels"])
+
+    def get_partition_files(
+            self,
+            channel: str,
+            start_date: Optional[str] = None,
+            stop_date: Optional[str] = None) -> List[str]:
+        """Returns the partition files of a channel that overlap a time
+        interval, in time order.
+
+        Args:
+            channel (str): channel name
+            start_date (str, optional): start date for interval
+            stop_date (str, optional): stop date for interval
+
+        Returns:
+            List[str]: paths to the overlapping partition files
+        """
+        start, stop = get_interval_bounds(start_date, stop_date)
+        partitions = sorted(self.manifest["channels"][channel].values(),
+                            key=lambda part: part["min"])
+        return [os.path.join(self.root, part["file"]) for part in partitions
+                if (start is None or part["max"] >= start.value)
+                and (stop is None or part["min"] <= stop.value)]
+
+    def get_schema(self, channel: str, columns: Optional[List[str]] = None) -> DataFrame:
+        """Returns the columns and index of a channel without reading any
+        rows, from the footer of its first partition.
+
+        Args:
+            channel (str): channel name
+            columns (List[str], optional): only include these columns
+
+        Returns:
+            DataFrame: DataFrame without rows, without columns if the
+            channel has no partitions
+        """
+        files = self.get_partition_files(channel)
+        if not files:
+            return DataFrame()
+        return read_parquet_schema(files[0], columns)
+
+    def load(
+            self,
+            channel: str,
+            start_date: Optional[str] = None,
+            stop_date: Optional[str] = None,
+            columns: Optional[List[str]] = None) -> DataFrame:
+        """Loads all partitions of a channel that overlap a time interval,
+        without cutting them to the interval.
+
+        Args:
+            channel (str): channel name
+            start_date (str, optional): start date for interval
+            stop_date (str, optional): stop date for interval
+            columns (List[str], optional): only read these columns
+
+        Returns:
+            DataFrame: data of the overlapping partitions
+        """
+        files = self.get_partition_files(channel, start_date, stop_date)
+        if not files:
+            return DataFrame()
+        return pd.concat([pd.read_parquet(file, columns=columns)  # type: ignore
+                          for file in files])
+
+    def isolate_timeinterval(
+            self,
+            channel: str,
+            start_date: str,
+            stop_date: str,
+            columns: Optional[List[str]] = None) -> DataFrame:
+        """Isolates a time interval of a channel, like isolate_timeinterval()
+        in main.py, reading only the partitions that overlap it.
+
+        Args:
+            channel (str): channel name
+            start_date (str): start date for interval
+            stop_date (str): stop date for interval
+            columns (List[str], optional): only read these columns
+
+        Returns:
+            DataFrame: Isolated time interval
+        """
+        df = self.load(channel, start_date, stop_date, columns)
+        if df.empty:
+            return df
+        return isolate_timeinterval(df, start_date, stop_date)
+
+    def isolate_step_index_in_timeinterval(
+            self,
+            channel: str,
+            start_date: str,
+            stop_date: str,
+            step_index: int,
+            step_col_name: str = STEP_INDEX_COL) -> DataFrame:
+        """Isolates a step index within a time interval of a channel, like
+        isolate_step_index_in_timeinterval() in main.py.
+
+        Args:
+            channel (str): channel name
+            start_date (str): start date for interval
+            stop_date (str): stop date for interval
+            step_index (int): step index for interval
+            step_col_name (str): name of the step index column
+
+        Returns:
+            DataFrame: DataFrame that only contains a specific
+            step index within a time interval.
+        """
+        df = self.isolate_timeinterval(channel, start_date, stop_date)
+        if df.empty:
+            return df
+        return isolate_step_index(df, step_index, step_col_name)
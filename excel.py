@@ -0,0 +1,205 @@
+from pandas import DataFrame
+from typing import Any, Iterator, List, Optional, Tuple
+import pandas as pd
+
+from cache import ExportCache
+from loading import DATE_TIME_COL, STEP_INDEX_COL, filter_frame, prepare_frame
+from registry import get_canonical_names, get_default_registry
+
+
+def _open_workbook(path: str) -> Any:
+    import openpyxl  # optional dependency, only needed for Excel exports
+    return openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+
+def get_channel_sheets(path: str) -> List[str]:
+    """Returns the sheets of an Excel export that contain channel data,
+    i.e. whose header has a time column according to the schema registry.
+
+    Args:
+        path (str): path to the .xlsx export
+
+    Returns:
+        List[str]: names of the channel sheets
+    """
+    workbook = _open_workbook(path)
+    try:
+        sheets: List[str] = []
+        for sheet in workbook.worksheets:
+            header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+            columns = [str(col) for col in header if col is not None]
+            if get_default_registry().lookup(columns)["time"] is not None:
+                sheets.append(sheet.title)
+        return sheets
+    finally:
+        workbook.close()
+
+
+def read_xlsx_chunks(
+        path: str,
+        sheet_name: Optional[str] = None,
+        start_date: Optional[str] = None,
+        stop_date: Optional[str] = None,
+        step_index: Optional[int] = None,
+        chunksize: int = 50_000,
+        step_col_name: str = STEP_INDEX_COL,
+        columns: Optional[List[str]] = None) -> Iterator[DataFrame]:
+    """Streams the rows of one sheet of an Excel export in read-only mode and
+    converts them in batches to the column layout main.py expects (canonical
+    column names, DateTime index). Like read_csv_chunks(), only the rows in
+    the time interval and step index are yielded and at most one batch is
+    held in memory.
+
+    Args:
+        path (str): path to the .xlsx export
+        sheet_name (str, optional): sheet to read, the first channel sheet
+            by default
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+        step_index (int, optional): step index to keep
+        chunksize (int): number of rows converted per batch
+        step_col_name (str): canonical name of the step index column
+        columns (List[str], optional): only convert these canonical
+            columns, the date column and the step index column are added
+            if needed
+
+    Yields:
+        DataFrame: non-empty filtered batches with a DateTime index
+    """
+    if sheet_name is None:
+        sheet_name = get_channel_sheets(path)[0]
+    workbook = _open_workbook(path)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = _get_canonical_header(next(rows, ()))
+        keep = _get_kept_positions(header, columns,
+                                   step_col_name if step_index is not None else None)
+        names = [header[idx] for idx in keep]
+        batch: List[List[Any]] = []
+        for row in rows:
+            batch.append([row[idx] for idx in keep])
+            if len(batch) == chunksize:
+                chunk = _convert_batch(batch, names, start_date, stop_date, step_index, step_col_name)
+                batch = []
+                if len(chunk):
+                    yield chunk
+        if batch:
+            chunk = _convert_batch(batch, names, start_date, stop_date, step_index, step_col_name)
+            if len(chunk):
+                yield chunk
+    finally:
+        workbook.close()
+
+
+def _get_canonical_header(row: Tuple[Any, ...]) -> List[str]:
+    header = [str(col) for col in row]
+    canonical = get_canonical_names(header)
+    return [canonical.get(col, col) for col in header]
+
+
+def _get_kept_positions(
+        header: List[str],
+        columns: Optional[List[str]],
+        step_col_name: Optional[str]) -> List[int]:
+    return [idx for idx, col in enumerate(header)
+            if columns is None or col in columns or col in (DATE_TIME_COL, step_col_name)]
+
+
+def _convert_batch(
+        batch: List[List[Any]],
+        names: List[str],
+        start_date: Optional[str],
+        stop_date: Optional[str],
+        step_index: Optional[int],
+        step_col_name: str) -> DataFrame:
+    chunk = DataFrame(batch, columns=names)
+    chunk = prepare_frame(chunk.infer_objects(), DATE_TIME_COL)
+    return filter_frame(chunk, start_date, stop_date, step_index, step_col_name)
+
+
+def read_xlsx_filtered(
+        path: str,
+        sheet_name: Optional[str] = None,
+        start_date: Optional[str] = None,
+        stop_date: Optional[str] = None,
+        step_index: Optional[int] = None,
+        chunksize: int = 50_000,
+        step_col_name: str = STEP_INDEX_COL,
+        columns: Optional[List[str]] = None) -> DataFrame:
+    """Reads only the rows of an Excel sheet that lie within a time interval
+    and have a specific step index, see read_xlsx_chunks().
+
+    Args:
+        path (str): path to the .xlsx export
+        sheet_name (str, optional): sheet to read, the first channel sheet
+            by default
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+        step_index (int, optional): step index to keep
+        chunksize (int): number of rows converted per batch
+        step_col_name (str): canonical name of the step index column
+        columns (List[str], optional): only convert these canonical columns
+
+    Returns:
+        DataFrame: filtered DataFrame with a DateTime index
+    """
+    chunks = list(read_xlsx_chunks(path, sheet_name, start_date, stop_date, step_index,
+                                   chunksize, step_col_name, columns))
+    if not chunks:
+        return read_xlsx_schema(path, sheet_name, columns,
+                                step_col_name if step_index is not None else None)
+    return pd.concat(chunks)  # type: ignore
+
+
+def read_xlsx_schema(
+        path: str,
+        sheet_name: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        step_col_name: Optional[str] = None) -> DataFrame:
+    """Returns an empty DataFrame with the columns and the DateTime index
+    read_xlsx_filtered() would return, reading only the header row.
+
+    Args:
+        path (str): path to the .xlsx export
+        sheet_name (str, optional): sheet to read, the first channel sheet
+            by default
+        columns (List[str], optional): only include these canonical columns
+        step_col_name (str, optional): canonical name of the step index
+            column to add
+
+    Returns:
+        DataFrame: DataFrame without rows
+    """
+    if sheet_name is None:
+        sheet_name = get_channel_sheets(path)[0]
+    workbook = _open_workbook(path)
+    try:
+        header = _get_canonical_header(
+            next(workbook[sheet_name].iter_rows(max_row=1, values_only=True), ()))
+    finally:
+        workbook.close()
+    df = DataFrame(columns=[header[idx] for idx in _get_kept_positions(header, columns, step_col_name)])
+    df[DATE_TIME_COL] = pd.Series(dtype="datetime64[ns, UTC]")
+    return df.set_index(DATE_TIME_COL)  # type: ignore
+
+
+def load_xlsx_cached(cache: ExportCache, path: str, sheet_name: Optional[str] = None) -> DataFrame:
+    """Returns a complete sheet of an Excel export from the columnar cache,
+    streaming it with read_xlsx_chunks() on a cache miss.
+
+    Args:
+        cache (ExportCache): cache holding the parsed sheets
+        path (str): path to the .xlsx export
+        sheet_name (str, optional): sheet to read, the first channel sheet
+            by default
+
+    Returns:
+        DataFrame: sheet with canonical columns and a DateTime index
+    """
+    if sheet_name is None:
+        sheet_name = get_channel_sheets(path)[0]
+    df = cache.get(path, variant=sheet_name)
+    if df is None:
+        df = read_xlsx_filtered(path, sheet_name)
+        cache.put(path, df, variant=sheet_name)
+    return df
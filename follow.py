@@ -0,0 +1,146 @@
+from pandas import DataFrame, DatetimeIndex, DatetimeTZDtype
+from typing import Dict, List, Optional
+import csv
+import io
+import os
+import numpy as np
+import pandas as pd
+
+from loading import (CURRENT_COL, DATE_TIME_COL, STEP_INDEX_COL, TEST_TIME_COL,
+                     filter_frame, prepare_frame)
+from merging import get_time_keys
+
+
+INITIAL_CAPACITY = 1024
+
+
+class ExportFollower:
+    """Follows a cycler export that is still being written. Every call of
+    poll() parses only the rows appended since the last call, so a refresh
+    takes time proportional to the new data.
+
+    The rows are appended to growable column buffers, whose capacity doubles
+    when they are full, so neither poll() nor reading frame copies the rows
+    read before.
+
+    Besides the rows, the follower keeps the capacity of get_smallest_cap_cell()
+    up to date by extending the trapezoidal integral with the new rows only.
+
+    Args:
+        path (str): path to the CSV export
+        start_date (str, optional): only keep rows from this date on
+        stop_date (str, optional): only keep rows up to this date
+        step_index (int, optional): only keep rows of this step index,
+            e.g. the discharge step of a running capacity test
+    """
+
+    def __init__(
+            self,
+            path: str,
+            start_date: Optional[str] = None,
+            stop_date: Optional[str] = None,
+            step_index: Optional[int] = None) -> None:
+        self.path = path
+        self.start_date = start_date
+        self.stop_date = stop_date
+        self.step_index = step_index
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all rows read so far, the next poll() starts at the
+        beginning of the file."""
+        self.offset = 0
+        self.header: Optional[List[str]] = None
+        self.capacity = 0.0
+        self.n_rows = 0
+        self._keys = np.empty(0, dtype=np.int64)
+        self._buffers: Dict[str, np.ndarray] = {}  # type: ignore
+        self._index_dtype: object = np.dtype("M8[ns]")
+        self._frame: Optional[DataFrame] = None
+        self._last_sample: Optional[DataFrame] = None
+
+    @property
+    def frame(self) -> DataFrame:
+        """All rows read so far as DataFrame with a DateTime index. The
+        DataFrame is a view of the buffers of the follower and must not be
+        modified."""
+        if self._frame is None:
+            if self.header is None or not self._buffers:
+                return DataFrame(columns=self.header)
+            index = DatetimeIndex(pd.arrays.DatetimeArray(  # type: ignore
+                self._keys[:self.n_rows].view("M8[ns]"), dtype=self._index_dtype),
+                name=DATE_TIME_COL)
+            self._frame = DataFrame({col: values[:self.n_rows] for col, values in self._buffers.items()},
+                                    index=index, columns=list(self._buffers), copy=False)
+        return self._frame
+
+    def _append(self, new_df: DataFrame) -> None:
+        n_rows = self.n_rows + len(new_df)
+        capacity = len(self._keys)
+        if n_rows > capacity:
+            capacity = max(INITIAL_CAPACITY, 2 * capacity, n_rows)
+        new_keys = get_time_keys(new_df)
+        self._keys = self._grow(self._keys, capacity, new_keys.dtype)
+        self._keys[self.n_rows:n_rows] = new_keys
+        self._index_dtype = new_df.index.dtype
+        for col in new_df.columns:
+            values = new_df[col].to_numpy()
+            buffer = self._buffers.get(col, np.empty(0, dtype=values.dtype))
+            buffer = self._grow(buffer, capacity, np.result_type(buffer.dtype, values.dtype))
+            buffer[self.n_rows:n_rows] = values
+            self._buffers[col] = buffer
+        self.n_rows = n_rows
+        self._frame = None
+
+    def _grow(self, buffer: np.ndarray, capacity: int, dtype: np.dtype) -> np.ndarray:  # type: ignore
+        """Returns the buffer with the given capacity and dtype, reallocating
+        it only if needed. Frames returned before keep the old buffer."""
+        if len(buffer) >= capacity and buffer.dtype == dtype:
+            return buffer
+        grown = np.empty(capacity, dtype=dtype)
+        grown[:self.n_rows] = buffer[:self.n_rows]
+        return grown
+
+    def _read_new_lines(self) -> str:
+        if os.path.getsize(self.path) < self.offset:
+            self.reset()  # the file was truncated or replaced
+        with open(self.path, "rb") as file:
+            file.seek(self.offset)
+            data = file.read()
+        complete = data.rfind(b"\n") + 1  # the last line may still be written
+        self.offset += complete
+        return data[:complete].decode()
+
+    def poll(self) -> DataFrame:
+        """Parses the rows appended since the last call.
+
+        Returns:
+            DataFrame: the new rows (after filtering) with a DateTime index
+        """
+        text = self._read_new_lines()
+        if self.header is None:
+            header_end = text.find("\n") + 1
+            if not header_end:
+                return DataFrame()
+            self.header = next(csv.reader([text[:header_end]]))
+            text = text[header_end:]
+        if not text.strip():
+            return DataFrame(columns=self.header)
+
+        new_df = pd.read_csv(io.StringIO(text), header=None, names=self.header)  # type: ignore
+        new_df = prepare_frame(new_df, DATE_TIME_COL)
+        new_df = filter_frame(new_df, self.start_date, self.stop_date,
+                              self.step_index, STEP_INDEX_COL)
+        if len(new_df):
+            self._update_capacity(new_df)
+            self._append(new_df)
+        return new_df
+
+    def _update_capacity(self, new_df: DataFrame) -> None:
+        segment = new_df[[TEST_TIME_COL, CURRENT_COL]]
+        if self._last_sample is not None:
+            segment = pd.concat([self._last_sample, segment])  # type: ignore
+        current = segment[CURRENT_COL].to_numpy()
+        test_time = segment[TEST_TIME_COL].to_numpy()
+        self.capacity += float(-np.trapz(current, test_time) / 3600)  # type: ignore
+        self._last_sample = segment.iloc[-1:]
@@ -0,0 +1,129 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import fnmatch
+import os
+
+from cache import ExportCache
+
+
+def _load_into_cache(cache: ExportCache, path: str) -> None:
+    """Parses an export into the cache without returning it, so the parsed
+    DataFrame is not sent back from the worker process."""
+    cache.load(path)
+
+
+class DropDirectoryWatcher:
+    """Watches a directory that cyclers drop their exports into and parses
+    new or changed exports into an ExportCache, so the first interactive
+    query after a file lands is served from the cache.
+
+    A file is only parsed once its size and modification time did not change
+    between two scans, so exports that are still being copied are skipped.
+    At most max_concurrency files are parsed at the same time.
+
+    Args:
+        directory (str): watched directory
+        cache (ExportCache): cache the parsed exports are written to
+        patterns (Sequence[str]): file name patterns of exports
+        max_concurrency (int): number of exports parsed at the same time
+        poll_interval (float): seconds between two scans in run()
+        executor (Executor, optional): pool the exports are parsed in,
+            a process pool with max_concurrency workers by default
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            cache: ExportCache,
+            patterns: Sequence[str] = ("*.csv", "*.CSV"),
+            max_concurrency: int = 2,
+            poll_interval: float = 5.0,
+            executor: Optional[Executor] = None) -> None:
+        self.directory = directory
+        self.cache = cache
+        self.patterns = patterns
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.executor = executor
+        self.errors: Dict[str, BaseException] = {}
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._ingested: Dict[str, Tuple[int, int]] = {}
+
+    def scan(self) -> List[str]:
+        """Returns the exports that are new or changed since they were last
+        parsed and did not change since the previous scan.
+
+        Returns:
+            List[str]: paths of exports ready to be parsed
+        """
+        ready: List[str] = []
+        seen: Dict[str, Tuple[int, int]] = {}
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not any(
+                    fnmatch.fnmatchcase(entry.name, pattern) for pattern in self.patterns):
+                continue
+            stat = entry.stat()
+            version = (stat.st_size, stat.st_mtime_ns)
+            seen[entry.path] = version
+            if self._seen.get(entry.path) == version and self._ingested.get(entry.path) != version:
+                ready.append(entry.path)
+        self._seen = seen
+        return sorted(ready)
+
+    async def _ingest(self, path: str, semaphore: asyncio.Semaphore, executor: Executor) -> None:
+        async with semaphore:
+            version = self._seen[path]
+            await asyncio.get_running_loop().run_in_executor(executor, _load_into_cache, self.cache, path)
+            self._ingested[path] = version
+
+    async def run_once(self, executor: Optional[Executor] = None) -> List[str]:
+        """Scans the directory once and parses all exports that are ready.
+        Exports that fail to parse are recorded in errors and retried when
+        they change.
+
+        Args:
+            executor (Executor, optional): pool the exports are parsed in,
+                the executor of the watcher by default
+
+        Returns:
+            List[str]: paths of the exports written to the cache
+        """
+        executor = executor or self.executor
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=self.max_concurrency) as pool:
+                return await self.run_once(pool)
+        paths = self.scan()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(self._ingest(path, semaphore, executor) for path in paths),
+                                       return_exceptions=True)
+        ingested: List[str] = []
+        for path, result in zip(paths, results):
+            if isinstance(result, BaseException):
+                self.errors[path] = result
+                self._ingested[path] = self._seen[path]
+            else:
+                self.errors.pop(path, None)
+                ingested.append(path)
+        return ingested
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        """Scans the directory every poll_interval seconds until stop_event
+        is set.
+
+        Args:
+            stop_event (asyncio.Event, optional): event ending the watcher,
+                runs forever if not given
+        """
+        stop_event = stop_event or asyncio.Event()
+        executor = self.executor or ProcessPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            while not stop_event.is_set():
+                await self.run_once(executor)
+                try:
+                    await asyncio.wait_for(stop_event.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
@@ -0,0 +1,144 @@
+from pandas import DataFrame, DatetimeIndex
+from typing import Any, Dict, Iterable, Iterator, Union
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from store import ArrayStore, ArrayView
+
+
+INDEX_METADATA_KEY = b"pybatpredictor.index"
+
+
+def _numpy_to_arrow(values: np.ndarray) -> Any:  # type: ignore
+    """Wraps an integer or float numpy array as Arrow array without copying
+    it. Booleans are converted, because Arrow stores them as bits."""
+    if values.dtype.kind in "iuf" and values.flags.c_contiguous:
+        return pa.Array.from_buffers(pa.from_numpy_dtype(values.dtype), len(values),
+                                     [None, pa.py_buffer(values)])
+    return pa.array(values, from_pandas=True)
+
+
+def _timestamps_to_arrow(keys: np.ndarray, tz: Any) -> Any:  # type: ignore
+    return pa.Array.from_buffers(pa.timestamp("ns", tz=None if tz is None else str(tz)),
+                                 len(keys), [None, pa.py_buffer(np.ascontiguousarray(keys))])
+
+
+def frame_to_record_batch(df: DataFrame) -> Any:
+    """Converts a DataFrame, e.g. a raw step slice or the output of
+    get_final_SOC() or get_capacity_list(), to an Arrow record batch.
+    Contiguous numeric columns and a DateTime index are shared with Arrow
+    instead of being copied. The index is stored as first column and
+    restored by record_batch_to_frame().
+
+    Args:
+        df (DataFrame): DataFrame to convert
+
+    Returns:
+        pa.RecordBatch: record batch with the index and all columns
+    """
+    index_name = str(df.index.name) if df.index.name is not None else "index"
+    if isinstance(df.index, DatetimeIndex):
+        index_array = _timestamps_to_arrow(df.index.asi8, df.index.tz)
+    else:
+        index_array = pa.array(df.index.to_numpy(), from_pandas=True)
+    arrays = [index_array] + [_numpy_to_arrow(df[col].to_numpy()) for col in df.columns]
+    names = [index_name] + [str(col) for col in df.columns]
+    metadata: Dict[bytes, bytes] = {INDEX_METADATA_KEY: json.dumps(index_name).encode()}
+    return pa.RecordBatch.from_arrays(arrays, names=names).replace_schema_metadata(metadata)
+
+
+def view_to_record_batch(view: ArrayView) -> Any:
+    """Converts a view of a memory-mapped ArrayStore to an Arrow record
+    batch that points directly into the mapped files.
+
+    Args:
+        view (ArrayView): view of a store, e.g. from isolate_timeinterval()
+
+    Returns:
+        pa.RecordBatch: record batch with the time index and all columns
+    """
+    store = view.store
+    index_name = store.index_name or "index"
+    arrays = [_timestamps_to_arrow(view.timestamps, store.tz)]
+    arrays += [_numpy_to_arrow(view[col]) for col in store.columns]
+    metadata: Dict[bytes, bytes] = {INDEX_METADATA_KEY: json.dumps(index_name).encode()}
+    return pa.RecordBatch.from_arrays(arrays, names=[index_name] + store.columns) \
+        .replace_schema_metadata(metadata)
+
+
+def iter_store_record_batches(store: ArrayStore, max_rows: int = 1_000_000) -> Iterator[Any]:
+    """Yields the complete ArrayStore as zero-copy Arrow record batches.
+
+    Args:
+        store (ArrayStore): memory-mapped store
+        max_rows (int): maximum number of rows per batch
+
+    Yields:
+        pa.RecordBatch: consecutive parts of the store
+    """
+    for start in range(0, len(store), max_rows):
+        yield view_to_record_batch(ArrayView(store, start, min(start + max_rows, len(store))))
+
+
+def record_batch_to_frame(batch: Any) -> DataFrame:
+    """Converts an Arrow record batch or table back to a DataFrame. Every
+    column is kept in its own block, so numeric columns without missing
+    values are not copied.
+
+    Args:
+        batch (Union[pa.RecordBatch, pa.Table]): data to convert
+
+    Returns:
+        DataFrame: DataFrame with the index restored if the batch was written
+        by frame_to_record_batch()
+    """
+    table = pa.Table.from_batches([batch]) if isinstance(batch, pa.RecordBatch) else batch
+    metadata = table.schema.metadata or {}
+    if INDEX_METADATA_KEY not in metadata:
+        return table.to_pandas(split_blocks=True)  # type: ignore
+    index_name = json.loads(metadata[INDEX_METADATA_KEY])
+    df: DataFrame = table.drop([index_name]).to_pandas(split_blocks=True)  # type: ignore
+    df.index = pd.Index(table.column(index_name).to_pandas(),  # type: ignore
+                        name=None if index_name == "index" else index_name)
+    return df
+
+
+def write_ipc_file(path: str, data: Union[DataFrame, Any, Iterable[Any]]) -> None:
+    """Writes a DataFrame, a record batch or several record batches with the
+    same schema to an Arrow IPC file, to hand them to another process on the
+    same host.
+
+    Args:
+        path (str): path to the IPC file
+        data (Union[DataFrame, pa.RecordBatch, Iterable[pa.RecordBatch]]):
+            data to write
+    """
+    if isinstance(data, DataFrame):
+        batches = [frame_to_record_batch(data)]
+    elif isinstance(data, pa.RecordBatch):
+        batches = [data]
+    else:
+        batches = list(data)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, batches[0].schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+
+def read_ipc_file(path: str) -> DataFrame:
+    """Reads an Arrow IPC file written by write_ipc_file(). The file is
+    memory-mapped, so numeric columns are backed by the page cache instead
+    of being copied into the process.
+
+    Args:
+        path (str): path to the IPC file
+
+    Returns:
+        DataFrame: data with the index restored
+    """
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return record_batch_to_frame(table)
+
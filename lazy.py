@@ -0,0 +1,309 @@
+from pandas import DataFrame
+from typing import List, Optional
+import pandas as pd
+
+from cache import ExportCache
+from dataset import PartitionedDataset
+from excel import get_channel_sheets, load_xlsx_cached, read_xlsx_filtered, read_xlsx_schema
+from loading import (STEP_INDEX_COL, filter_frame, get_interval_bounds, read_csv_filtered,
+                     read_csv_schema)
+from store import ArrayStore, ArrayView
+
+
+class CsvSource:
+    """Storage layer reading a CSV export in chunks, see read_csv_filtered().
+
+    Args:
+        path (str): path to the CSV export
+        chunksize (int): number of rows parsed per chunk
+    """
+
+    def __init__(self, path: str, chunksize: int = 100_000) -> None:
+        self.path = path
+        self.chunksize = chunksize
+
+    def read(
+            self,
+            start_date: Optional[str],
+            stop_date: Optional[str],
+            step_index: Optional[int],
+            step_col_name: str,
+            columns: Optional[List[str]]) -> DataFrame:
+        df = read_csv_filtered(self.path, start_date, stop_date, step_index,
+                               self.chunksize, step_col_name=step_col_name, columns=columns)
+        return df if columns is None else df[columns]
+
+    def read_schema(self, columns: Optional[List[str]]) -> DataFrame:
+        df = read_csv_schema(self.path, columns)
+        return df if columns is None else df[columns]
+
+
+class CachedSource:
+    """Storage layer reading an export through an ExportCache. Only the
+    requested columns are read from the cached Parquet file.
+
+    Args:
+        path (str): path to the export
+        cache (ExportCache): cache holding the parsed export
+    """
+
+    def __init__(self, path: str, cache: ExportCache) -> None:
+        self.path = path
+        self.cache = cache
+
+    def read(
+            self,
+            start_date: Optional[str],
+            stop_date: Optional[str],
+            step_index: Optional[int],
+            step_col_name: str,
+            columns: Optional[List[str]]) -> DataFrame:
+        read_columns = _with_step_column(columns, step_index, step_col_name)
+        df = self.cache.get(self.path, read_columns)
+        if df is None:
+            df = self.cache.load(self.path)
+            if read_columns is not None:
+                df = df[read_columns]
+        df = filter_frame(df, start_date, stop_date, step_index, step_col_name)
+        return df if columns is None else df[columns]
+
+    def read_schema(self, columns: Optional[List[str]]) -> DataFrame:
+        df = self.cache.get_schema(self.path, columns)
+        if df is None:  # * the export is parsed into the cache once, like in read()
+            return self.read(None, None, None, STEP_INDEX_COL, columns).iloc[:0]
+        return df
+
+
+class XlsxSource:
+    """Storage layer reading one sheet of an Excel export. Without a cache
+    the sheet is streamed with read_xlsx_filtered(), with a cache the
+    parsed sheet is stored in and read from the columnar cache.
+
+    Args:
+        path (str): path to the .xlsx export
+        sheet_name (str, optional): sheet to read, the first channel sheet
+            by default
+        cache (ExportCache, optional): cache holding the parsed sheets
+    """
+
+    def __init__(
+            self,
+            path: str,
+            sheet_name: Optional[str] = None,
+            cache: Optional[ExportCache] = None) -> None:
+        self.path = path
+        self.sheet_name = sheet_name
+        self.cache = cache
+
+    def read(
+            self,
+            start_date: Optional[str],
+            stop_date: Optional[str],
+            step_index: Optional[int],
+            step_col_name: str,
+            columns: Optional[List[str]]) -> DataFrame:
+        if self.cache is None:
+            df = read_xlsx_filtered(self.path, self.sheet_name, start_date, stop_date,
+                                    step_index, step_col_name=step_col_name, columns=columns)
+        else:
+            df = load_xlsx_cached(self.cache, self.path, self.sheet_name)
+            df = filter_frame(df, start_date, stop_date, step_index, step_col_name)
+        return df if columns is None else df[columns]
+
+    def read_schema(self, columns: Optional[List[str]]) -> DataFrame:
+        if self.cache is not None:
+            sheet_name = self.sheet_name or get_channel_sheets(self.path)[0]
+            df = self.cache.get_schema(self.path, columns, variant=sheet_name)
+            if df is not None:
+                return df
+        df = read_xlsx_schema(self.path, self.sheet_name, columns)
+        return df if columns is None else df[columns]
+
+
+class DatasetSource:
+    """Storage layer reading one channel of a PartitionedDataset. Only the
+    partitions overlapping the time interval are opened.
+
+    Args:
+        dataset (PartitionedDataset): dataset holding the channel history
+        channel (str): channel name
+    """
+
+    def __init__(self, dataset: PartitionedDataset, channel: str) -> None:
+        self.dataset = dataset
+        self.channel = channel
+
+    def read(
+            self,
+            start_date: Optional[str],
+            stop_date: Optional[str],
+            step_index: Optional[int],
+            step_col_name: str,
+            columns: Optional[List[str]]) -> DataFrame:
+        read_columns = _with_step_column(columns, step_index, step_col_name)
+        df = self.dataset.load(self.channel, start_date, stop_date, read_columns)
+        if df.empty:
+            return df
+        df = filter_frame(df, start_date, stop_date, step_index, step_col_name)
+        return df if columns is None else df[columns]
+
+    def read_schema(self, columns: Optional[List[str]]) -> DataFrame:
+        return self.dataset.get_schema(self.channel, columns)
+
+
+class ArrayStoreSource:
+    """Storage layer reading from a memory-mapped ArrayStore. The time
+    interval is found by binary search and only the rows of the matching
+    step runs are copied.
+
+    Args:
+        store (ArrayStore): memory-mapped store
+    """
+
+    def __init__(self, store: ArrayStore) -> None:
+        self.store = store
+
+    def read(
+            self,
+            start_date: Optional[str],
+            stop_date: Optional[str],
+            step_index: Optional[int],
+            step_col_name: str,
+            columns: Optional[List[str]]) -> DataFrame:
+        if step_index is None:
+            return self.store.isolate_timeinterval(start_date, stop_date).to_frame(columns)
+        runs = self.store.isolate_step_index_in_timeinterval(
+            start_date, stop_date, step_index, step_col_name)
+        if not runs:
+            return ArrayView(self.store, 0, 0).to_frame(columns)
+        return pd.concat([run.to_frame(columns) for run in runs])  # type: ignore
+
+    def read_schema(self, columns: Optional[List[str]]) -> DataFrame:
+        return ArrayView(self.store, 0, 0).to_frame(columns)
+
+
+def _with_step_column(
+        columns: Optional[List[str]],
+        step_index: Optional[int],
+        step_col_name: str) -> Optional[List[str]]:
+    if columns is None or step_index is None or step_col_name in columns:
+        return columns
+    return columns + [step_col_name]
+
+
+class LazyFrame:
+    """Lazy handle on battery time series data in a storage layer (CsvSource,
+    CachedSource, XlsxSource, DatasetSource or ArrayStoreSource). The isolate_* methods
+    only record the filters, in the same vocabulary as main.py, and return
+    a new LazyFrame. to_frame() pushes all filters down to the storage layer
+    and materializes only the matching rows and columns. Filters that can
+    not match any row, like two different step indices, only read the
+    schema of the storage layer.
+
+    Args:
+        source: storage layer the data is read from
+    """
+
+    def __init__(
+            self,
+            source: object,
+            start_date: Optional[str] = None,
+            stop_date: Optional[str] = None,
+            step_index: Optional[int] = None,
+            step_col_name: str = STEP_INDEX_COL,
+            columns: Optional[List[str]] = None,
+            empty: bool = False) -> None:
+        self.source = source
+        self.start_date = start_date
+        self.stop_date = stop_date
+        self.step_index = step_index
+        self.step_col_name = step_col_name
+        self.columns = columns
+        self.empty = empty
+
+    def _replace(self, **changes: object) -> "LazyFrame":
+        state = dict(self.__dict__)
+        state.update(changes)
+        return LazyFrame(**state)  # type: ignore
+
+    def __repr__(self) -> str:
+        return (f"LazyFrame(start_date={self.start_date!r}, stop_date={self.stop_date!r}, "
+                f"step_index={self.step_index!r}, columns={self.columns!r})")
+
+    def isolate_timeinterval(self, start_date: str, stop_date: str) -> "LazyFrame":
+        """Records a time interval filter. Repeated intervals are intersected.
+
+        Args:
+            start_date (str): start date for interval
+            stop_date (str): stop date for interval
+
+        Returns:
+            LazyFrame: handle with the additional filter
+        """
+        start, stop = get_interval_bounds(start_date, stop_date)
+        old_start, old_stop = get_interval_bounds(self.start_date, self.stop_date)
+        if old_start is not None and old_start > start:  # type: ignore
+            start_date = self.start_date  # type: ignore
+        if old_stop is not None and old_stop < stop:  # type: ignore
+            stop_date = self.stop_date  # type: ignore
+        return self._replace(start_date=start_date, stop_date=stop_date)
+
+    def isolate_step_index(self, step_index: int, col_name: str = STEP_INDEX_COL) -> "LazyFrame":
+        """Records a step index filter.
+
+        Args:
+            step_index (int): Step Index Number
+            col_name (str): name of the step index column
+
+        Returns:
+            LazyFrame: handle with the additional filter
+        """
+        if self.step_index is not None and (self.step_index, self.step_col_name) != (step_index, col_name):
+            return self._replace(empty=True)
+        return self._replace(step_index=step_index, step_col_name=col_name)
+
+    def isolate_step_index_in_timeinterval(
+            self,
+            start_date: str,
+            stop_date: str,
+            step_index: int,
+            step_col_name: str = STEP_INDEX_COL) -> "LazyFrame":
+        """Records a time interval and a step index filter.
+
+        Args:
+            start_date (str): starting date for interval
+            stop_date (str): stopping date for interval
+            step_index (int): step index for interval
+            step_col_name (str): name of the step index column
+
+        Returns:
+            LazyFrame: handle with the additional filters
+        """
+        return self.isolate_timeinterval(start_date, stop_date).isolate_step_index(
+            step_index, step_col_name)
+
+    def select(self, columns: List[str]) -> "LazyFrame":
+        """Records a column filter. Repeated selections are intersected.
+
+        Args:
+            columns (List[str]): columns to keep
+
+        Returns:
+            LazyFrame: handle with the additional filter
+        """
+        if self.columns is not None:
+            columns = [col for col in columns if col in self.columns]
+        return self._replace(columns=list(columns))
+
+    def to_frame(self) -> DataFrame:
+        """Reads the rows and columns matching all filters from the storage
+        layer.
+
+        Returns:
+            DataFrame: matching data with a DateTime index
+        """
+        if self.empty:
+            return self.source.read_schema(self.columns)  # type: ignore
+        df: DataFrame = self.source.read(  # type: ignore
+            self.start_date, self.stop_date, self.step_index, self.step_col_name, self.columns)
+        return df
@@ -0,0 +1,454 @@
+from pandas import DataFrame, Period, Series, Timestamp
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import csv
+import pandas as pd
+
+from registry import get_default_registry
+
+
+DATE_TIME_COL = "Date_Time"
+STEP_INDEX_COL = "Step_Index"
+TEST_TIME_COL = "Test_Time(s)"
+CURRENT_COL = "Current(A)"
+
+# Timestamp formats written by the supported cyclers, tried in this order.
+DATE_FORMATS: List[str] = [
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S.%f",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S.%f",
+]
+
+_date_format_cache: Dict[Tuple[str, ...], Optional[str]] = {}
+
+# Column roles each analysis function in main.py reads, besides the DateTime
+# index. The roles are resolved against the file header with the schema
+# registry, so the same spellings are accepted as by get_voltage_column_list().
+COLUMN_DEPENDENCIES: Dict[str, List[str]] = {
+    "isolate_timeinterval": [],
+    "isolate_step_index": ["step"],
+    "isolate_step_index_in_timeinterval": ["step"],
+    "calculate_testtime": ["test_time"],
+    "get_voltage_column_list": ["cell_voltages"],
+    "get_number_voltage_columns": ["cell_voltages"],
+    "trim_to_cutoff_voltage": ["cell_voltages"],
+    "plot_cell_voltages": ["cell_voltages"],
+    "get_smallest_voltage_cell": ["cell_voltages"],
+    "get_SOC_reference": ["test_time", "cell_voltages"],
+    "get_final_SOC": ["test_time", "current", "cell_voltages"],
+    "get_smallest_cap_cell": ["test_time", "current"],
+    "get_capacity_list": ["test_time", "current", "cell_voltages"],
+}
+
+
+def get_interval_bounds(
+        start_date: Optional[str],
+        stop_date: Optional[str]) -> Tuple[Optional[Timestamp], Optional[Timestamp]]:
+    """Converts the date strings used by isolate_timeinterval into UTC
+    timestamps. The stop date is extended to the end of its resolution,
+    so "2021-01-28" includes the whole day, just like pandas label slicing.
+
+    Args:
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+
+    Returns:
+        Tuple[Timestamp, Timestamp]: inclusive start and stop timestamps,
+        None where no bound was given.
+    """
+    start = _to_utc(start_date, end=False) if start_date is not None else None
+    stop = _to_utc(stop_date, end=True) if stop_date is not None else None
+    return start, stop
+
+
+def _to_utc(date: str, end: bool) -> Timestamp:
+    try:
+        period = Period(date)
+        timestamp = period.end_time if end else period.start_time
+    except ValueError:
+        timestamp = Timestamp(date)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def detect_date_format(values: Series, n_samples: int = 100) -> Optional[str]:  # type: ignore
+    """Finds the first format in DATE_FORMATS that parses a sample of
+    date strings.
+
+    Args:
+        values (Series): date strings
+        n_samples (int): number of non-empty values to try
+
+    Returns:
+        str: strptime format or None if no known format matches
+    """
+    samples = values.dropna().head(n_samples)
+    if samples.empty:
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            pd.to_datetime(samples, format=date_format)  # type: ignore
+            return date_format
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def parse_date_time(values: Series, schema: Optional[Tuple[str, ...]] = None) -> Series:  # type: ignore
+    """Parses date strings as UTC time. The format is detected once per
+    schema (the column names of an export) and cached, after which all
+    values are parsed with the explicit format. Values that do not match it
+    are detected and parsed again, and the cache is updated if most values
+    use the new format, e.g. for another export with the same header but a
+    different timestamp style. Values no known format matches become NaT.
+    If no known format matches at all, pandas format inference is used.
+
+    Args:
+        values (Series): date strings
+        schema (Tuple[str, ...], optional): column names of the export,
+            used as cache key
+
+    Returns:
+        Series: parsed timestamps
+    """
+    if values.dtype.kind == "M":
+        return pd.to_datetime(values, utc=True)  # type: ignore
+    if schema is not None and schema in _date_format_cache:
+        date_format = _date_format_cache[schema]
+    else:
+        date_format = detect_date_format(values)
+    date_time = _parse_with_format(values, date_format)
+    failed = date_time.isna() & values.notna()
+    if failed.any():
+        retry_format = detect_date_format(values[failed])
+        if retry_format != date_format:
+            date_time = date_time.fillna(_parse_with_format(values[failed], retry_format))
+            if failed.sum() * 2 > len(values):
+                date_format = retry_format
+    if schema is not None:
+        _date_format_cache[schema] = date_format
+    return date_time
+
+
+def _parse_with_format(values: Series, date_format: Optional[str]) -> Series:  # type: ignore
+    if date_format is None:
+        return pd.to_datetime(values, utc=True, errors="coerce")  # type: ignore
+    return pd.to_datetime(values, format=date_format, utc=True, errors="coerce")  # type: ignore
+
+
+def reconstruct_date_time(
+        df: DataFrame,
+        date_time: Optional[Series] = None,  # type: ignore
+        start_time: Optional[Union[str, Timestamp]] = None) -> Series:  # type: ignore
+    """Reconstructs missing timestamps from the test time. The start of the
+    test is given by start_time or derived from the first valid timestamp
+    and its "Test_Time(s)".
+
+    Args:
+        df (DataFrame): raw cycler export with a "Test_Time(s)" column
+        date_time (Series, optional): parsed timestamps with NaT where
+            they are missing
+        start_time (Union[str, Timestamp], optional): date and time the
+            test started
+
+    Raises:
+        ValueError: if neither a start time nor any valid timestamp is given
+
+    Returns:
+        Series: timestamps without missing values
+    """
+    test_time = pd.to_timedelta(df[TEST_TIME_COL], unit="s")  # type: ignore
+    if isinstance(start_time, Timestamp):
+        start = start_time
+    elif start_time is not None:
+        start, _ = get_interval_bounds(start_time, None)
+    elif date_time is not None and date_time.notna().any():
+        first_valid = date_time.notna().to_numpy().argmax()
+        start = date_time.iloc[first_valid] - test_time.iloc[first_valid]
+    else:
+        raise ValueError("Timestamps can not be reconstructed without a start time.")
+    reconstructed = start + test_time
+    if date_time is None:
+        return reconstructed  # type: ignore
+    return date_time.fillna(reconstructed)  # type: ignore
+
+
+def get_test_start(df: DataFrame) -> Optional[Timestamp]:
+    """Derives the date and time a test started from the first row of a
+    DataFrame prepared with prepare_frame(), so that the timestamps of
+    later chunks of the same export can be reconstructed with it.
+
+    Args:
+        df (DataFrame): DataFrame with a DateTime index and a
+            "Test_Time(s)" column
+
+    Returns:
+        Timestamp: start of the test or None if it can not be derived
+    """
+    if not len(df) or TEST_TIME_COL not in df.columns or pd.isna(df[TEST_TIME_COL].iloc[0]):
+        return None
+    return df.index[0] - pd.to_timedelta(df[TEST_TIME_COL].iloc[0], unit="s")  # type: ignore
+
+
+def prepare_frame(
+        df: DataFrame,
+        date_col: str = DATE_TIME_COL,
+        start_time: Optional[Union[str, Timestamp]] = None) -> DataFrame:
+    """Parses the date column of a raw cycler export as UTC time and sets it
+    as index, which is the layout the functions in main.py expect.
+    Missing or malformed timestamps are reconstructed from the test time,
+    see reconstruct_date_time().
+
+    Args:
+        df (DataFrame): raw cycler export
+        date_col (str): name of the date column
+        start_time (Union[str, Timestamp], optional): date and time the
+            test started, only needed if the export has no valid timestamps
+            at all
+
+    Returns:
+        DataFrame: DataFrame with a DateTime index
+    """
+    if date_col in df.columns:
+        date_time = parse_date_time(df[date_col], tuple(df.columns))
+        if date_time.isna().any() and TEST_TIME_COL in df.columns:
+            date_time = reconstruct_date_time(df, date_time, start_time)
+    else:
+        date_time = reconstruct_date_time(df, None, start_time)
+    df[date_col] = date_time
+    return df.set_index(date_col)  # type: ignore
+
+
+def filter_frame(
+        df: DataFrame,
+        start_date: Optional[str] = None,
+        stop_date: Optional[str] = None,
+        step_index: Optional[int] = None,
+        step_col_name: str = STEP_INDEX_COL) -> DataFrame:
+    """Applies time interval and step index filters to a DataFrame with a
+    DateTime index. Unlike isolate_timeinterval, the index does not need to
+    be sorted.
+
+    Args:
+        df (DataFrame): DataFrame with a DateTime index
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+        step_index (int, optional): step index to keep
+        step_col_name (str): name of the step index column
+
+    Returns:
+        DataFrame: rows matching all given filters
+    """
+    start, stop = get_interval_bounds(start_date, stop_date)
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df.index >= start
+    if stop is not None:
+        mask &= df.index <= stop
+    if step_index is not None:
+        mask &= df[step_col_name] == step_index
+    if bool(mask.all()):
+        return df
+    return df[mask.to_numpy()]
+
+
+def read_csv_chunks(
+        path: str,
+        start_date: Optional[str] = None,
+        stop_date: Optional[str] = None,
+        step_index: Optional[int] = None,
+        chunksize: int = 100_000,
+        date_col: str = DATE_TIME_COL,
+        step_col_name: str = STEP_INDEX_COL,
+        columns: Optional[List[str]] = None,
+        start_time: Optional[str] = None) -> Iterator[DataFrame]:
+    """Streams a cycler export in chunks of a fixed number of rows and
+    yields only the rows within the time interval and step index.
+    At most one chunk is held in memory at a time. Missing timestamps are
+    reconstructed with the start of the test, which is derived from the
+    first chunk if no start_time is given, see prepare_frame().
+
+    Args:
+        path (str): path to the CSV export
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+        step_index (int, optional): step index to keep
+        chunksize (int): number of rows parsed per chunk
+        date_col (str): name of the date column
+        step_col_name (str): name of the step index column
+        columns (List[str], optional): only parse these columns, the date,
+            test time and step index columns are added if needed
+        start_time (str, optional): date and time the test started
+
+    Yields:
+        DataFrame: non-empty filtered chunks with a DateTime index
+    """
+    usecols = _get_usecols(path, columns, date_col,
+                           step_col_name if step_index is not None else None)
+    test_start = start_time
+    with pd.read_csv(path, chunksize=chunksize, usecols=usecols) as reader:  # type: ignore
+        for chunk in reader:
+            chunk = prepare_frame(chunk, date_col, test_start)
+            if test_start is None:
+                test_start = get_test_start(chunk)
+            chunk = filter_frame(chunk, start_date, stop_date,
+                                 step_index, step_col_name)
+            if len(chunk):
+                yield chunk
+
+
+def read_csv_filtered(
+        path: str,
+        start_date: Optional[str] = None,
+        stop_date: Optional[str] = None,
+        step_index: Optional[int] = None,
+        chunksize: int = 100_000,
+        date_col: str = DATE_TIME_COL,
+        step_col_name: str = STEP_INDEX_COL,
+        columns: Optional[List[str]] = None,
+        start_time: Optional[str] = None) -> DataFrame:
+    """Reads only the rows of a cycler export that lie within a time interval
+    and have a specific step index. The file is streamed with
+    read_csv_chunks(), so it never has to fit into memory completely.
+
+    Args:
+        path (str): path to the CSV export
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+        step_index (int, optional): step index to keep
+        chunksize (int): number of rows parsed per chunk
+        date_col (str): name of the date column
+        step_col_name (str): name of the step index column
+        columns (List[str], optional): only parse these columns, the date,
+            test time and step index columns are added if needed
+        start_time (str, optional): date and time the test started
+
+    Returns:
+        DataFrame: filtered DataFrame with a DateTime index
+    """
+    chunks = list(read_csv_chunks(path, start_date, stop_date, step_index,
+                                  chunksize, date_col, step_col_name, columns, start_time))
+    if not chunks:
+        return read_csv_schema(path, columns, date_col,
+                               step_col_name if step_index is not None else None)
+    return pd.concat(chunks)  # type: ignore
+
+
+def read_csv_schema(
+        path: str,
+        columns: Optional[List[str]] = None,
+        date_col: str = DATE_TIME_COL,
+        step_col_name: Optional[str] = None) -> DataFrame:
+    """Returns an empty DataFrame with the columns and the DateTime index
+    read_csv_filtered() would return, without parsing any rows.
+
+    Args:
+        path (str): path to the CSV export
+        columns (List[str], optional): only include these columns, the date,
+            test time and step index columns are added if needed
+        date_col (str): name of the date column
+        step_col_name (str, optional): name of the step index column to add
+
+    Returns:
+        DataFrame: DataFrame without rows
+    """
+    usecols = _get_usecols(path, columns, date_col, step_col_name)
+    df = pd.read_csv(path, nrows=0, usecols=usecols)
+    df[date_col] = pd.Series(dtype="datetime64[ns, UTC]")
+    return df.set_index(date_col)  # type: ignore
+
+
+def _get_usecols(
+        path: str,
+        columns: Optional[List[str]],
+        date_col: str,
+        step_col_name: Optional[str]) -> Optional[List[str]]:
+    if columns is None:
+        return None
+    # * missing or malformed timestamps are reconstructed from the test time
+    header = read_header(path)
+    time_cols = [col for col in (date_col, TEST_TIME_COL) if col in header]
+    usecols = time_cols + [col for col in columns if col not in time_cols]
+    if step_col_name is not None and step_col_name not in usecols:
+        usecols.append(step_col_name)
+    return usecols
+
+
+def read_header(path: str) -> List[str]:
+    """Returns the column names of a CSV export without parsing any data.
+
+    Args:
+        path (str): path to the CSV export
+
+    Returns:
+        List[str]: column names
+    """
+    with open(path, newline="") as file:
+        return next(csv.reader(file), [])
+
+
+def get_required_columns(
+        header: List[str],
+        functions: Iterable[Union[str, Callable[..., object]]],
+        date_col: str = DATE_TIME_COL) -> List[str]:
+    """Resolves the columns needed by analysis functions against a header,
+    using COLUMN_DEPENDENCIES and the roles of the header in the schema
+    registry. The date column is always included.
+
+    Args:
+        header (List[str]): column names of the export
+        functions (Iterable[Union[str, Callable]]): analysis functions from
+            main.py or their names
+
+    Raises:
+        KeyError: if a function has no declared column dependencies
+
+    Returns:
+        List[str]: required columns in header order
+    """
+    schema = get_default_registry().lookup(header)
+    required = {date_col}
+    for function in functions:
+        name = function if isinstance(function, str) else function.__name__
+        for role in COLUMN_DEPENDENCIES[name]:
+            if isinstance(schema[role], list):
+                required.update(schema[role])
+            elif schema[role] is not None:
+                required.add(schema[role])
+    return [col for col in header if col in required]
+
+
+def read_csv_for_analysis(
+        path: str,
+        functions: Iterable[Union[str, Callable[..., object]]],
+        start_date: Optional[str] = None,
+        stop_date: Optional[str] = None,
+        step_index: Optional[int] = None,
+        chunksize: int = 100_000,
+        start_time: Optional[str] = None) -> DataFrame:
+    """Reads only the columns of a cycler export that the given analysis
+    functions need. The header is sniffed first, so all other columns are
+    skipped by the CSV parser.
+
+    Args:
+        path (str): path to the CSV export
+        functions (Iterable[Union[str, Callable]]): analysis functions from
+            main.py or their names, e.g. [get_final_SOC]
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+        step_index (int, optional): step index to keep
+        chunksize (int): number of rows parsed per chunk
+        start_time (str, optional): date and time the test started
+
+    Returns:
+        DataFrame: projected and filtered DataFrame with a DateTime index
+    """
+    columns = get_required_columns(read_header(path), functions)
+    return read_csv_filtered(path, start_date, stop_date, step_index,
+                             chunksize, columns=columns, start_time=start_time)
@@ -1,7 +1,9 @@
-from pandas import DataFrame, Series
+from pandas import DataFrame, Index, Series
 from typing import List
 import numpy as np
 
+from registry import get_cell_ids, get_default_registry
+
 
 def isolate_timeinterval(
         df: DataFrame,
@@ -84,6 +86,8 @@ def calculate_testtime(df: DataFrame) -> Series:  # type: ignore
 
 def get_voltage_column_list(df: DataFrame) -> List[str]:
     """Returns a list of the names of the columns containing cell voltages.
+    The columns are looked up in the schema registry, so each header is
+    only scanned once.
 
     Args:
         df (DataFrame): DataFrame with "Aux_Voltage" columns
@@ -91,8 +95,7 @@ def get_voltage_column_list(df: DataFrame) -> List[str]:
     Returns:
         list[str]: List of "Aux_Voltage"-Columns
     """
-    col_names: list[str] = list(df.columns)
-    cell_voltage_list = [name for name in col_names if "Aux_Voltage_" in name]
+    cell_voltage_list: List[str] = list(get_default_registry().lookup(df.columns)["cell_voltages"])
     return cell_voltage_list
 
 
@@ -109,7 +112,51 @@ def get_number_voltage_columns(df: DataFrame) -> int:
     return voltage_col_name_len
 
 
-def trim_to_cutoff_voltage(df: DataFrame, cutoff_voltage: float) -> DataFrame:
+def get_min_cell_voltage(df: DataFrame) -> np.ndarray:  # type: ignore
+    """Returns the lowest cell voltage of every row in one pass over all
+    "Aux_Voltage" columns. Missing values are ignored.
+
+    Args:
+        df (DataFrame): DataFrame with "Aux_Voltage" columns
+
+    Returns:
+        np.ndarray: row-wise minimum of the cell voltages
+    """
+    voltages = df[get_voltage_column_list(df)].to_numpy(dtype=np.float64)
+    if voltages.shape[1] == 0:
+        return np.full(len(df), np.nan)
+    return np.fmin.reduce(voltages, axis=1)
+
+
+def get_cutoff_row(min_voltage: np.ndarray, cutoff_voltage: float, debounce: int = 1) -> int:  # type: ignore
+    """Finds the first row at which the lowest cell voltage drops below the
+    cutoff voltage and stays below it for a number of consecutive samples.
+
+    Args:
+        min_voltage (np.ndarray): row-wise minimum of the cell voltages,
+            see get_min_cell_voltage()
+        cutoff_voltage (float): cutoff voltage
+        debounce (int): number of consecutive samples that have to be
+            below the cutoff voltage
+
+    Returns:
+        int: first row of the crossing, or the number of rows if the
+        cutoff voltage is never reached
+    """
+    below = np.asarray(min_voltage) < cutoff_voltage
+    if debounce > 1:
+        counts = np.cumsum(np.r_[0, below])
+        below = counts[debounce:] - counts[:-debounce] == debounce
+    if not below.any():
+        return len(min_voltage)
+    return int(np.argmax(below))
+
+
+def trim_to_cutoff_voltage(
+        df: DataFrame,
+        cutoff_voltage: float,
+        first_crossing: bool = False,
+        debounce: int = 1) -> DataFrame:
     """Trims a DataFrame up to a specific "Aux_Voltage". Useful for
     isolating a specific voltage range in a battey capacity test
 
@@ -117,9 +164,16 @@ def trim_to_cutoff_voltage(df: DataFrame, cutoff_voltage: float) -> DataFrame:
         df (DataFrame): battery test time series data
         cutoff_voltage (float): voltage past which the data should be
             trimmed
+        first_crossing (bool): cut the data at the first row where any cell
+            drops below the cutoff voltage instead of dropping every row
+            below it, so samples after a recovered dip are removed too
+        debounce (int): with first_crossing, number of consecutive samples
+            that have to be below the cutoff voltage
     Returns:
         DataFrame: Trimmed DataFrame
     """
+    if first_crossing:
+        return df.iloc[:get_cutoff_row(get_min_cell_voltage(df), cutoff_voltage, debounce)]
     voltage_column_list = get_voltage_column_list(df)
     for col in voltage_column_list:
         df = df[df[col] >= cutoff_voltage]
@@ -199,6 +253,41 @@ def soc_from_lut(refdf: DataFrame, voltage: float) -> float:
     return refdf.iloc[np.argmin(abs(refdf[refdf.columns[0]]-voltage))][1]  # type: ignore
 
 
+def get_nearest_rows(reference: np.ndarray, values: np.ndarray) -> np.ndarray:  # type: ignore
+    """Finds the row of the nearest reference value for every value with a
+    single sorted lookup instead of one full scan per value. Like np.argmin
+    of the absolute differences, ties resolve to the first row and missing
+    reference values are skipped.
+
+    Args:
+        reference (np.ndarray): reference values, e.g. the voltages of a
+            SOC lookup table
+        values (np.ndarray): values to look up
+
+    Returns:
+        np.ndarray: row of the nearest reference value, -1 for missing values
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(reference, kind="stable")
+    sorted_ref = reference[order][:np.count_nonzero(~np.isnan(reference))]
+    if len(sorted_ref) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+
+    right = np.clip(np.searchsorted(sorted_ref, values, side="left"), 0, len(sorted_ref) - 1)
+    left = np.clip(right - 1, 0, None)
+    # first row of the group of equal reference values on both sides
+    left = np.searchsorted(sorted_ref, sorted_ref[left], side="left")
+    left_distance = np.abs(sorted_ref[left] - values)
+    right_distance = np.abs(sorted_ref[right] - values)
+    left_row, right_row = order[left], order[right]
+    rows = np.where(left_distance < right_distance, left_row,
+                    np.where(right_distance < left_distance, right_row,
+                             np.minimum(left_row, right_row)))
+    rows[np.isnan(values)] = -1
+    return rows.astype(np.int64)
+
+
 def get_final_SOC(df: DataFrame) -> DataFrame:
     """Returns a DataFrame that represents the SOC of each cell of a cell stack
     at the end of a capacity test. This requires a capacity test dataframe with 
@@ -214,28 +303,18 @@ def get_final_SOC(df: DataFrame) -> DataFrame:
 
     smallest_cap = get_smallest_cap_cell(df)                    # * isolate the cell that first reaches cutoff voltage
 
-    output_df = DataFrame()                                     # * generate new dataframe for final output dataframe
-
-    soc_list = []                                               # * generate list for SOC values in percent
-    capacity_list = []                                          # * generate list for capacity values in mAh
     voltage_cols = get_voltage_column_list(df)                  # * generate list of cell voltage columns
+    final_voltages = df[voltage_cols].to_numpy(dtype=np.float64)[-1]  # * final voltage of every cell
 
-    for col in voltage_cols:                                    # * iterate over cell voltage columns
-        soc = soc_from_lut(refdf, df[col][-1])  # type: ignore  # * calculate SOC value for each cell voltage column
-        cap = smallest_cap + smallest_cap*soc/100               # * calculate capacity value for each cell voltage column
-        soc_list.append(soc)  # type: ignore                    # * append SOC value to SOC value list
-        capacity_list.append(cap)  # type:ignore                # * append capacity value to capacity value list
-
-    output_df["SOC (%)"] = soc_list                             # * generate SOC column in output dataframe
-    output_df["Capacity (Ah)"] = capacity_list                  # * generate capacity column in output dataframe
+    rows = get_nearest_rows(refdf[refdf.columns[0]].to_numpy(), final_voltages)
+    soc = np.where(rows >= 0, refdf[refdf.columns[1]].to_numpy()[rows], np.nan)  # * SOC of every cell from the lookup table
+    cap = smallest_cap + smallest_cap*soc/100                   # * capacity of every cell
 
     # * change the name of the voltage columns to the respective cell names
-    for idx, cell in enumerate(voltage_cols):
-        voltage_cols[idx] = cell.replace("Aux_Voltage_", "Cell ")
-        voltage_cols[idx] = voltage_cols[idx].replace("(V)", "")
+    cell_ids = get_cell_ids(voltage_cols)
 
-    output_df["Cell ID"] = voltage_cols                         # * generate cell ID column in output dataframe
-    output_df = output_df.set_index("Cell ID")  # type: ignore  # * set index to cell ID column
+    output_df = DataFrame({"SOC (%)": soc, "Capacity (Ah)": cap},
+                          index=Index(cell_ids, name="Cell ID"))
     return output_df
 
 
@@ -0,0 +1,279 @@
+from pandas import DataFrame, DatetimeIndex, Timestamp
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+def get_time_keys(df: DataFrame) -> np.ndarray:  # type: ignore
+    """Returns the DateTime index of a DataFrame as int64 nanoseconds
+    since epoch (UTC).
+
+    Args:
+        df (DataFrame): DataFrame with a DateTime index
+
+    Returns:
+        np.ndarray: int64 timestamps
+    """
+    index: DatetimeIndex = df.index  # type: ignore
+    return index.asi8  # type: ignore
+
+
+def exports_overlap(df_list: List[DataFrame], touching: bool = False) -> bool:
+    """Checks if the time ranges of several time-ordered exports overlap.
+
+    Args:
+        df_list (List[DataFrame]): non-empty DataFrames with sorted
+            DateTime index
+        touching (bool): also count exports as overlapping if one starts
+            exactly where another one stops
+
+    Returns:
+        bool: True if any two exports share a part of their time range
+    """
+    ranges = sorted((df.index[0], df.index[-1]) for df in df_list)
+    for (_, prev_stop), (next_start, _) in zip(ranges, ranges[1:]):
+        if next_start < prev_stop or (touching and next_start == prev_stop):
+            return True
+    return False
+
+
+def get_overlap_intervals(df_list: List[DataFrame]) -> List[Tuple[Timestamp, Timestamp]]:
+    """Returns the time windows in which at least two time-ordered exports
+    overlap or touch.
+
+    Args:
+        df_list (List[DataFrame]): non-empty DataFrames with sorted
+            DateTime index
+
+    Returns:
+        List[Tuple[Timestamp, Timestamp]]: inclusive, non-overlapping
+        windows in time order
+    """
+    ranges = sorted((df.index[0], df.index[-1]) for df in df_list)
+    intervals: List[Tuple[Timestamp, Timestamp]] = []
+    if not ranges:
+        return intervals
+    reach = ranges[0][1]
+    for start, stop in ranges[1:]:
+        if start <= reach:
+            window = (start, min(reach, stop))
+            if intervals and window[0] <= intervals[-1][1]:
+                window = (intervals[-1][0], max(intervals[-1][1], window[1]))
+                intervals[-1] = window
+            else:
+                intervals.append(window)
+        reach = max(reach, stop)
+    return intervals
+
+
+def _merge_positions(keys_list: List[np.ndarray]) -> Tuple[np.ndarray, List[np.ndarray]]:  # type: ignore
+    """Merges sorted key arrays pairwise in a tree (O(n log k)) and returns
+    the merged keys as well as the destination row of every input row.
+    On equal keys, rows of earlier inputs come first."""
+    groups = [(keys, [np.arange(len(keys))], [idx])
+              for idx, keys in enumerate(keys_list)]
+    while len(groups) > 1:
+        merged_groups = []
+        for pair_idx in range(0, len(groups) - 1, 2):
+            keys_a, pos_a, ids_a = groups[pair_idx]
+            keys_b, pos_b, ids_b = groups[pair_idx + 1]
+            dest_a = np.arange(len(keys_a)) + np.searchsorted(keys_b, keys_a, side="left")
+            dest_b = np.arange(len(keys_b)) + np.searchsorted(keys_a, keys_b, side="right")
+            keys = np.empty(len(keys_a) + len(keys_b), dtype=keys_a.dtype)
+            keys[dest_a] = keys_a
+            keys[dest_b] = keys_b
+            positions = [dest_a[pos] for pos in pos_a] + [dest_b[pos] for pos in pos_b]
+            merged_groups.append((keys, positions, ids_a + ids_b))
+        if len(groups) % 2:
+            merged_groups.append(groups[-1])
+        groups = merged_groups
+    keys, positions, ids = groups[0]
+    ordered_positions: List[np.ndarray] = [np.empty(0)] * len(keys_list)  # type: ignore
+    for idx, pos in zip(ids, positions):
+        ordered_positions[idx] = pos
+    return keys, ordered_positions
+
+
+def merge_exports(df_list: List[DataFrame]) -> DataFrame:
+    """Merges several time-ordered exports into one time-ordered DataFrame.
+    This replaces df1.append(df2).sort_values(by="Date_Time"): exports that
+    do not overlap in time are simply concatenated in time order, overlapping
+    exports are combined with a k-way merge of the sorted timestamps instead
+    of a full sort. Rows with equal timestamps keep the order of df_list.
+
+    Args:
+        df_list (List[DataFrame]): DataFrames with a sorted DateTime index
+
+    Raises:
+        ValueError: if one of the DataFrames is not sorted by time
+
+    Returns:
+        DataFrame: merged DataFrame with a sorted DateTime index
+    """
+    df_list = [df for df in df_list if len(df)]
+    if not df_list:
+        return DataFrame()
+    for df in df_list:
+        if not df.index.is_monotonic_increasing:
+            raise ValueError("All exports must be sorted by their DateTime index.")
+    if len(df_list) == 1:
+        return df_list[0].copy()
+
+    if not exports_overlap(df_list):
+        df_list = sorted(df_list, key=lambda df: (df.index[0], df.index[-1]))
+        return pd.concat(df_list)  # type: ignore
+
+    keys, positions = _merge_positions([get_time_keys(df) for df in df_list])
+    columns = list(df_list[0].columns)
+    same_layout = all(list(df.columns) == columns for df in df_list) and all(
+        all(df[col].dtype == df_list[0][col].dtype and isinstance(df[col].dtype, np.dtype)
+            for col in columns) for df in df_list)
+    if not same_layout:
+        order = np.empty(len(keys), dtype=np.int64)
+        offset = 0
+        for df, pos in zip(df_list, positions):
+            order[pos] = np.arange(offset, offset + len(df))
+            offset += len(df)
+        return pd.concat(df_list).take(order)  # type: ignore
+
+    merged = {}
+    for col in columns:
+        values = np.empty(len(keys), dtype=df_list[0][col].dtype)
+        for df, pos in zip(df_list, positions):
+            values[pos] = df[col].to_numpy()
+        merged[col] = values
+    first_index: DatetimeIndex = df_list[0].index  # type: ignore
+    index = DatetimeIndex(keys.view(first_index.values.dtype), name=first_index.name)
+    if first_index.tz is not None:
+        index = index.tz_localize("UTC").tz_convert(first_index.tz)
+    return DataFrame(merged, index=index, columns=columns)
+
+
+def _equals_previous(values: np.ndarray) -> np.ndarray:  # type: ignore
+    """Compares every value of an array with the value before it, treating
+    two missing values as equal.
+
+    Args:
+        values (np.ndarray): column values
+
+    Returns:
+        np.ndarray: boolean array, one shorter than values
+    """
+    same = values[1:] == values[:-1]
+    if values.dtype.kind in "fcmMO":
+        missing = pd.isna(values)
+        same |= missing[1:] & missing[:-1]
+    return same
+
+
+def drop_duplicate_samples(
+        df: DataFrame,
+        subset: Optional[List[str]] = None,
+        time_tolerance: str = "0s",
+        value_atol: float = 0.0,
+        intervals: Optional[List[Tuple[Timestamp, Timestamp]]] = None) -> Tuple[DataFrame, int]:
+    """Removes duplicated samples from a time-ordered DataFrame. A row is a
+    duplicate if its timestamp is within time_tolerance of the last kept
+    row and all compared values are within value_atol of it. Comparing with
+    the last kept row instead of the previous row keeps a slow series of
+    near-duplicates from being removed as a chain. With the defaults, only
+    exact duplicates are removed, which needs no loop, because an exact
+    duplicate of the last kept row is also one of the previous row.
+
+    Args:
+        df (DataFrame): DataFrame with a sorted DateTime index
+        subset (List[str], optional): columns to compare, all by default
+        time_tolerance (str): largest time difference of near-duplicates,
+            e.g. "500ms"
+        value_atol (float): largest absolute difference of compared values
+        intervals (List[Tuple[Timestamp, Timestamp]], optional): only check
+            rows within these inclusive time windows, e.g. from
+            get_overlap_intervals(), the whole DataFrame by default
+
+    Returns:
+        Tuple[DataFrame, int]: DataFrame without duplicates and the number
+        of removed rows
+    """
+    if len(df) < 2:
+        return df, 0
+    if subset is None:
+        subset = list(df.columns)
+    tolerance = pd.Timedelta(time_tolerance).value
+    exact = tolerance == 0 and value_atol == 0
+    keys = get_time_keys(df)
+    if intervals is None:
+        row_ranges = [(0, len(df))]
+    else:
+        row_ranges = [(int(np.searchsorted(keys, start.value, side="left")),
+                       int(np.searchsorted(keys, stop.value, side="right")))
+                      for start, stop in intervals]
+    is_numeric = [df[col].dtype.kind in "biuf" for col in subset]
+    numeric_cols = [col for col, numeric in zip(subset, is_numeric) if numeric]
+    is_duplicate = np.zeros(len(df), dtype=bool)
+    for start_row, stop_row in row_ranges:
+        if stop_row - start_row < 2:
+            continue
+        window_keys = keys[start_row:stop_row]
+        # * a row can only be a duplicate of the last kept row if it is close to
+        # * the previous row, and exact values match both rows or neither
+        candidate = np.diff(window_keys) <= tolerance
+        for col, numeric in zip(subset, is_numeric):
+            if exact or not numeric:
+                candidate &= _equals_previous(df[col].to_numpy()[start_row:stop_row])
+        if exact:
+            is_duplicate[start_row + 1:stop_row] = candidate
+            continue
+
+        # * near-duplicates are checked sequentially, but only for the candidates,
+        # * and a row within value_atol of the last kept row is within twice that
+        # * of the previous row
+        values = df[numeric_cols].iloc[start_row:stop_row].to_numpy(dtype=np.float64)
+        missing = np.isnan(values)
+        difference = np.abs(np.diff(values, axis=0))
+        both_missing = missing[1:] & missing[:-1]
+        near_previous = np.all((difference <= value_atol) | both_missing, axis=1)
+        candidate &= np.all((difference <= 2 * value_atol) | both_missing, axis=1)
+        kept = 0
+        for row in (np.flatnonzero(candidate) + 1).tolist():
+            if row == 1 or not candidate[row - 2]:
+                kept = row - 1  # * rows that are no candidates are always kept
+            if kept == row - 1:
+                is_same = near_previous[row - 1]
+            else:
+                is_same = (window_keys[row] - window_keys[kept] <= tolerance
+                           and np.all((np.abs(values[row] - values[kept]) <= value_atol)
+                                      | (missing[row] & missing[kept])))
+            if is_same:
+                is_duplicate[start_row + row] = True
+            else:
+                kept = row
+    removed = int(is_duplicate.sum())
+    if not removed:
+        return df, 0
+    return df[~is_duplicate], removed
+
+
+def merge_exports_deduplicated(
+        df_list: List[DataFrame],
+        subset: Optional[List[str]] = None,
+        time_tolerance: str = "0s",
+        value_atol: float = 0.0) -> Tuple[DataFrame, int]:
+    """Merges several time-ordered exports with merge_exports() and removes
+    duplicated samples where their time ranges overlap, so that the capacity
+    integral does not count them twice. Only the rows within the windows
+    from get_overlap_intervals() are checked for duplicates.
+
+    Args:
+        df_list (List[DataFrame]): DataFrames with a sorted DateTime index
+        subset (List[str], optional): columns to compare, all by default
+        time_tolerance (str): largest time difference of near-duplicates
+        value_atol (float): largest absolute difference of compared values
+
+    Returns:
+        Tuple[DataFrame, int]: merged DataFrame and the number of removed rows
+    """
+    merged = merge_exports(df_list)
+    intervals = get_overlap_intervals([df for df in df_list if len(df)])
+    if not intervals:
+        return merged, 0
+    return drop_duplicate_samples(merged, subset, time_tolerance, value_atol, intervals)
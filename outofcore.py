@@ -0,0 +1,181 @@
+from pandas import DataFrame
+from typing import Callable, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from dataset import PartitionedDataset
+from loading import (CURRENT_COL, DATE_TIME_COL, STEP_INDEX_COL,
+                     TEST_TIME_COL, filter_frame, get_required_columns, read_csv_chunks,
+                     read_header)
+from main import get_voltage_column_list
+from registry import get_cell_ids
+
+
+ChunkSource = Callable[[], Iterable[DataFrame]]
+
+# rough number of bytes one parsed value occupies while a chunk is processed
+BYTES_PER_VALUE = 24
+
+
+def get_chunk_rows(n_columns: int, memory_limit: int) -> int:
+    """Returns how many rows with n_columns columns can be processed at once
+    under a memory ceiling.
+
+    Args:
+        n_columns (int): number of columns per row
+        memory_limit (int): memory ceiling in bytes
+
+    Returns:
+        int: number of rows per chunk, at least 1
+    """
+    return max(1, memory_limit // (BYTES_PER_VALUE * (n_columns + 1)))
+
+
+def csv_chunk_source(
+        path: str,
+        start_date: Optional[str] = None,
+        stop_date: Optional[str] = None,
+        step_index: Optional[int] = None,
+        memory_limit: int = 256 * 1024**2) -> ChunkSource:
+    """Returns a chunk source that streams the rows of a CSV export needed
+    by get_final_SOC() under a memory ceiling.
+
+    Args:
+        path (str): path to the CSV export
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+        step_index (int, optional): step index to keep
+        memory_limit (int): memory ceiling in bytes
+
+    Returns:
+        ChunkSource: callable returning a new iterator over the chunks
+    """
+    columns = get_required_columns(read_header(path), ["get_final_SOC"])
+    chunksize = get_chunk_rows(len(columns) + 1, memory_limit)
+    return lambda: read_csv_chunks(path, start_date, stop_date, step_index,
+                                   chunksize, columns=columns)
+
+
+def dataset_chunk_source(
+        dataset: PartitionedDataset,
+        channel: str,
+        start_date: Optional[str] = None,
+        stop_date: Optional[str] = None,
+        step_index: Optional[int] = None,
+        memory_limit: int = 256 * 1024**2) -> ChunkSource:
+    """Returns a chunk source that streams the rows of a partitioned dataset
+    needed by get_final_SOC() under a memory ceiling. Only the partitions
+    overlapping the time interval are opened, and large partitions are read
+    in batches.
+
+    Args:
+        dataset (PartitionedDataset): dataset holding the channel history
+        channel (str): channel name
+        start_date (str, optional): start date for interval
+        stop_date (str, optional): stop date for interval
+        step_index (int, optional): step index to keep
+        memory_limit (int): memory ceiling in bytes
+
+    Returns:
+        ChunkSource: callable returning a new iterator over the chunks
+    """
+    files = dataset.get_partition_files(channel, start_date, stop_date)
+
+    def iter_chunks() -> Iterable[DataFrame]:
+        for file in files:
+            parquet_file = pq.ParquetFile(file)
+            header = [name for name in parquet_file.schema_arrow.names if name != DATE_TIME_COL]
+            columns = get_required_columns(header, ["get_final_SOC"]) + [STEP_INDEX_COL, DATE_TIME_COL]
+            batch_size = get_chunk_rows(len(columns), memory_limit)
+            for batch in parquet_file.iter_batches(batch_size, columns=list(dict.fromkeys(columns))):
+                chunk = batch.to_pandas()  # type: ignore
+                if DATE_TIME_COL in chunk.columns:
+                    chunk = chunk.set_index(DATE_TIME_COL)  # type: ignore
+                chunk = filter_frame(chunk, start_date, stop_date, step_index)
+                if len(chunk):
+                    yield chunk
+    return iter_chunks
+
+
+def _get_soc_reference_values(n_rows: int, rows: np.ndarray) -> np.ndarray:  # type: ignore
+    """Returns np.linspace(100, 0, n_rows)[rows], the SOC column of
+    get_SOC_reference(), without building the whole array."""
+    if n_rows == 1:
+        return np.full(len(rows), 100.0)
+    values = rows * (-100 / (n_rows - 1)) + 100.0
+    values[rows == n_rows - 1] = 0.0
+    return values
+
+
+def _iter_trimmed(
+        chunk_source: ChunkSource,
+        cutoff_voltage: Optional[float]) -> Iterable[DataFrame]:
+    for chunk in chunk_source():
+        if cutoff_voltage is not None:
+            voltage_cols = get_voltage_column_list(chunk)
+            chunk = chunk[(chunk[voltage_cols] >= cutoff_voltage).all(axis=1).to_numpy()]
+        if len(chunk):
+            yield chunk
+
+
+def get_final_SOC_out_of_core(
+        chunk_source: ChunkSource,
+        cutoff_voltage: Optional[float] = None) -> DataFrame:
+    """Out-of-core version of trim_to_cutoff_voltage() followed by
+    get_final_SOC(). The capacity test is streamed twice, chunk by chunk:
+    the first pass integrates the current and finds the final cell voltages,
+    the second pass looks up the SOC of every cell in the reference cell.
+    Only one chunk is held in memory at a time. The results are the same as
+    on the in-memory path, up to the rounding of the chunked capacity sum.
+
+    Args:
+        chunk_source (ChunkSource): callable returning an iterator over the
+            chunks of a capacity test, see csv_chunk_source() and
+            dataset_chunk_source()
+        cutoff_voltage (float, optional): voltage past which the data
+            should be trimmed
+
+    Returns:
+        DataFrame: dataframe representing the SOC at the end of capacity test.
+    """
+    n_rows = 0
+    capacity = 0.0
+    voltage_cols: List[str] = []
+    last_row: Optional[DataFrame] = None
+    for chunk in _iter_trimmed(chunk_source, cutoff_voltage):
+        if last_row is None:
+            voltage_cols = get_voltage_column_list(chunk)
+            segment = chunk
+        else:
+            segment = pd.concat([last_row, chunk[last_row.columns]])  # type: ignore
+        capacity += float(-np.trapz(segment[CURRENT_COL], segment[TEST_TIME_COL]) / 3600)  # type: ignore
+        n_rows += len(chunk)
+        last_row = chunk.iloc[-1:]
+    if last_row is None:
+        raise ValueError("The capacity test does not contain any rows.")
+
+    final_voltages = last_row[voltage_cols].to_numpy()[0]
+    smallest_cell = voltage_cols[int(np.argmin(final_voltages))]
+    best_diff = np.full(len(voltage_cols), np.inf)
+    best_row = np.zeros(len(voltage_cols), dtype=np.int64)
+    offset = 0
+    for chunk in _iter_trimmed(chunk_source, cutoff_voltage):
+        reference = chunk[smallest_cell].to_numpy()
+        diff = np.abs(reference[:, np.newaxis] - final_voltages[np.newaxis, :])
+        diff[np.isnan(diff)] = np.inf
+        rows = np.argmin(diff, axis=0)
+        chunk_best = diff[rows, np.arange(len(voltage_cols))]
+        improved = chunk_best < best_diff
+        best_diff[improved] = chunk_best[improved]
+        best_row[improved] = rows[improved] + offset
+        offset += len(chunk)
+
+    soc_ref = _get_soc_reference_values(n_rows, best_row).round(3)
+
+    output_df = DataFrame()
+    output_df["SOC (%)"] = soc_ref
+    output_df["Capacity (Ah)"] = capacity + capacity * soc_ref / 100
+    output_df["Cell ID"] = get_cell_ids(voltage_cols)
+    return output_df.set_index("Cell ID")  # type: ignore
+
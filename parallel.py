@@ -0,0 +1,175 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pandas import DataFrame, DatetimeIndex
+from typing import Any, Dict, List, Optional, Set
+import os
+import numpy as np
+
+from loading import read_csv_filtered
+from merging import get_time_keys, merge_exports
+
+
+def _to_shared_memory(values: np.ndarray) -> Dict[str, Any]:  # type: ignore
+    shm = SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+    # the parent process unlinks the block after copying it
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+    shm.close()
+    return {"shm": shm.name, "dtype": values.dtype.str, "length": len(values)}
+
+
+def _from_shared_memory(meta: Dict[str, Any]) -> np.ndarray:  # type: ignore
+    shm = SharedMemory(name=meta["shm"])
+    try:
+        values = np.ndarray(meta["length"], dtype=np.dtype(meta["dtype"]), buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return values
+
+
+def _unlink_shared_memory(meta: Dict[str, Any]) -> None:
+    try:
+        shm = SharedMemory(name=meta["shm"])
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _release_result(result: Dict[str, Any]) -> None:
+    """Unlinks all shared memory blocks of a worker result that were not
+    copied yet."""
+    blocks = [result.get("index")] + list(result["columns"].values())
+    for meta in blocks:
+        if meta is not None and "shm" in meta:
+            _unlink_shared_memory(meta)
+
+
+def _load_export_worker(path: str, columns: Optional[List[str]]) -> Dict[str, Any]:
+    """Parses an export in a worker process and places every numeric column
+    in shared memory. Only the small description of the blocks is pickled."""
+    df = read_csv_filtered(path, columns=columns)
+    index: DatetimeIndex = df.index  # type: ignore
+    result: Dict[str, Any] = {
+        "index_name": index.name,
+        "tz": str(index.tz) if index.tz is not None else None,
+        "columns": {},
+    }
+    try:
+        result["index"] = _to_shared_memory(get_time_keys(df))
+        for col in df.columns:
+            values = df[col].to_numpy()
+            if values.dtype.kind in "biufmM":
+                result["columns"][col] = _to_shared_memory(values)
+            else:
+                result["columns"][col] = {"values": values}
+    except BaseException:
+        _release_result(result)
+        raise
+    return result
+
+
+def _build_frame(result: Dict[str, Any]) -> DataFrame:
+    try:
+        index = DatetimeIndex(_from_shared_memory(result["index"]).view("M8[ns]"),
+                              name=result["index_name"])
+        if result["tz"] is not None:
+            index = index.tz_localize("UTC").tz_convert(result["tz"])
+        data = {col: meta["values"] if "values" in meta else _from_shared_memory(meta)
+                for col, meta in result["columns"].items()}
+    except BaseException:
+        _release_result(result)
+        raise
+    return DataFrame(data, index=index, columns=list(result["columns"]))
+
+
+def _drain_futures(running: Dict["Future[Dict[str, Any]]", str]) -> None:
+    """Cancels exports that did not start yet and unlinks the shared memory
+    blocks of all others once they are finished."""
+    for future in running:
+        future.cancel()
+    for future in running:
+        if future.cancelled():
+            continue
+        try:
+            _release_result(future.result())
+        except BaseException:
+            pass
+
+
+def load_exports_parallel(
+        paths: List[str],
+        max_workers: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        columns: Optional[List[str]] = None) -> Dict[str, DataFrame]:
+    """Parses several cycler exports in a process pool. The parsed columns
+    are handed back through shared memory instead of being pickled.
+
+    The memory budget limits how many exports are parsed at the same time:
+    a new export is only started while the file sizes of all exports in
+    flight stay below the budget. One export is always parsed, even if it
+    is larger than the budget.
+
+    If an export fails to parse, the exception is raised after the shared
+    memory of all other exports was released.
+
+    On platforms that start processes with "spawn" (macOS, Windows), call
+    this from within an `if __name__ == "__main__":` block.
+
+    Args:
+        paths (List[str]): paths to the CSV exports
+        max_workers (int, optional): number of worker processes,
+            defaults to the number of CPUs
+        memory_budget (int, optional): bytes of exports parsed at once,
+            unlimited by default
+        columns (List[str], optional): only parse these columns
+
+    Returns:
+        Dict[str, DataFrame]: parsed exports with a DateTime index by path
+    """
+    sizes = {path: os.path.getsize(path) for path in paths}
+    pending = list(paths)
+    results: Dict[str, DataFrame] = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        running: Dict[Future[Dict[str, Any]], str] = {}
+        in_flight = 0
+        try:
+            while pending or running:
+                while pending and (not running or memory_budget is None
+                                   or in_flight + sizes[pending[0]] <= memory_budget):
+                    path = pending.pop(0)
+                    running[executor.submit(_load_export_worker, path, columns)] = path
+                    in_flight += sizes[path]
+                done: Set[Future[Dict[str, Any]]] = wait(running, return_when=FIRST_COMPLETED).done
+                for future in done:
+                    path = running.pop(future)
+                    in_flight -= sizes[path]
+                    results[path] = _build_frame(future.result())
+        except BaseException:
+            # no other process unlinks the blocks of the remaining exports
+            _drain_futures(running)
+            raise
+    return {path: results[path] for path in paths}
+
+
+def load_exports_merged(
+        paths: List[str],
+        max_workers: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        columns: Optional[List[str]] = None) -> DataFrame:
+    """Parses several time-ordered cycler exports in a process pool with
+    load_exports_parallel() and merges them with merge_exports().
+
+    Args:
+        paths (List[str]): paths to the CSV exports
+        max_workers (int, optional): number of worker processes
+        memory_budget (int, optional): bytes of exports parsed at once
+        columns (List[str], optional): only parse these columns
+
+    Returns:
+        DataFrame: merged DataFrame with a sorted DateTime index
+    """
+    df_dict = load_exports_parallel(paths, max_workers, memory_budget, columns)
+    return merge_exports(list(df_dict.values()))
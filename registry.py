@@ -0,0 +1,214 @@
+from pandas import DataFrame
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+
+
+# Canonical column names of the single-valued roles, as used in main.py.
+CANONICAL_NAMES: Dict[str, str] = {
+    "time": "Date_Time",
+    "test_time": "Test_Time(s)",
+    "current": "Current(A)",
+    "step": "Step_Index",
+}
+
+# Spellings of the roles used by different cycler firmware versions. The
+# numbered roles capture the channel number to build the canonical name.
+ROLE_PATTERNS: Dict[str, List[str]] = {
+    "time": [r"^Date_Time$", r"^Date[ _]?Time$", r"^DateTime$", r"^Timestamp$"],
+    "test_time": [r"^Test_Time\(s\)$", r"^Test[ _]?Time[ _]?\(s\)$", r"^TestTime$"],
+    "current": [r"^Current\(A\)$", r"^Current[ _]?\(A\)$", r"^I[ _]?\(A\)$"],
+    "step": [r"^Step_Index$", r"^Step[ _]?Index$", r"^StepIndex$", r"^Step$"],
+    "cell_voltages": [r"^Aux_Voltage_(\d+)\(V\)$", r"^Aux[ _]?Volt(?:age)?[ _]?(\d+)[ _]?\(V\)$",
+                      r"Aux_Voltage_()"],  # any other name containing "Aux_Voltage_"
+    "temperatures": [r"^Aux_Temperature_(\d+)\(C\)$", r"^Aux[ _]?Temp(?:erature)?[ _]?(\d+)[ _]?\(C\)$"],
+}
+
+NUMBERED_NAMES: Dict[str, str] = {
+    "cell_voltages": "Aux_Voltage_{}(V)",
+    "temperatures": "Aux_Temperature_{}(C)",
+}
+
+
+def get_header_fingerprint(columns: Iterable[str]) -> str:
+    """Returns a fingerprint identifying a header variant.
+
+    Args:
+        columns (Iterable[str]): column names of the export
+
+    Returns:
+        str: hex digest of the column names
+    """
+    return hashlib.sha1("\x1f".join(columns).encode()).hexdigest()
+
+
+def _search_patterns(patterns: List[str], col: str) -> Optional["re.Match[str]"]:
+    return next((m for m in (re.search(pattern, col) for pattern in patterns) if m), None)
+
+
+def match_header(columns: Iterable[str]) -> Dict[str, Any]:
+    """Maps the columns of a header to their canonical roles: "time",
+    "test_time", "current", "step", "cell_voltages" and "temperatures".
+
+    Args:
+        columns (Iterable[str]): column names of the export
+
+    Returns:
+        Dict[str, Any]: column name for each single-valued role (None if
+        missing), lists of column names for the numbered roles, and
+        "canonical", the canonical name of every matched column
+    """
+    schema: Dict[str, Any] = {role: None for role in CANONICAL_NAMES}
+    schema.update({role: [] for role in NUMBERED_NAMES})
+    canonical: Dict[str, str] = {}
+    for col in columns:
+        for role, patterns in ROLE_PATTERNS.items():
+            match = _search_patterns(patterns, col)
+            if match is None:
+                continue
+            if role in NUMBERED_NAMES:
+                schema[role].append(col)
+                canonical[col] = NUMBERED_NAMES[role].format(match.group(1)) if match.group(1) else col
+            elif schema[role] is None:
+                schema[role] = col
+                canonical[col] = CANONICAL_NAMES[role]
+            break
+    schema["canonical"] = canonical
+    return schema
+
+
+class SchemaRegistry:
+    """Registry of header variants. A header is matched against
+    ROLE_PATTERNS only the first time it is seen; afterwards its roles are
+    a dictionary lookup. If a path is given, the mappings are persisted as
+    JSON, so they survive between sessions and can be corrected by hand.
+
+    Args:
+        path (str, optional): JSON file the mappings are persisted in
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._by_header: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._by_fingerprint: Dict[str, Dict[str, Any]] = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as file:
+                self._by_fingerprint = json.load(file)
+
+    def lookup(self, columns: Iterable[str]) -> Dict[str, Any]:
+        """Returns the role mapping of a header, see match_header().
+
+        Args:
+            columns (Iterable[str]): column names of the export
+
+        Returns:
+            Dict[str, Any]: role mapping of the header
+        """
+        header = tuple(columns)
+        schema = self._by_header.get(header)
+        if schema is None:
+            fingerprint = get_header_fingerprint(header)
+            schema = self._by_fingerprint.get(fingerprint)
+            if schema is None:
+                schema = match_header(header)
+                self._by_fingerprint[fingerprint] = schema
+                self.save()
+            self._by_header[header] = schema
+        return schema
+
+    def save(self) -> None:
+        """Writes the mappings to the JSON file of the registry, if any."""
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self._by_fingerprint, file, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+default_registry = SchemaRegistry()
+
+
+def get_default_registry() -> SchemaRegistry:
+    """Returns the registry used when no registry is passed explicitly.
+    Modules look it up on every call, so set_default_registry() takes
+    effect everywhere.
+
+    Returns:
+        SchemaRegistry: the default registry
+    """
+    return default_registry
+
+
+def set_default_registry(path: Optional[str] = None) -> SchemaRegistry:
+    """Replaces the default registry, e.g. with one persisted as JSON.
+
+    Args:
+        path (str, optional): JSON file the mappings are persisted in,
+            in memory only if not given
+
+    Returns:
+        SchemaRegistry: the new default registry
+    """
+    global default_registry
+    default_registry = SchemaRegistry(path)
+    return default_registry
+
+
+def get_canonical_names(
+        columns: Iterable[str],
+        registry: Optional[SchemaRegistry] = None) -> Dict[str, str]:
+    """Returns the renaming from the columns of a header variant to the
+    canonical names used by the analysis functions in main.py.
+
+    Args:
+        columns (Iterable[str]): column names of the export
+        registry (SchemaRegistry, optional): registry to use, the in-memory
+            default registry if not given
+
+    Returns:
+        Dict[str, str]: canonical name by column name
+    """
+    return (registry or get_default_registry()).lookup(columns)["canonical"]
+
+
+def get_cell_ids(voltage_cols: Iterable[str]) -> List[str]:
+    """Returns the cell IDs ("Cell 1", "Cell 2", ...) of cell voltage
+    columns, built from their canonical names, so every spelling of a
+    column gives the same ID. The columns are matched against
+    ROLE_PATTERNS directly, because they are not a header of their own
+    and must not be stored in a registry.
+
+    Args:
+        voltage_cols (Iterable[str]): cell voltage columns
+
+    Returns:
+        List[str]: cell ID of every column
+    """
+    cell_ids: List[str] = []
+    for col in voltage_cols:
+        match = _search_patterns(ROLE_PATTERNS["cell_voltages"], col)
+        canonical = NUMBERED_NAMES["cell_voltages"].format(match.group(1)) \
+            if match is not None and match.group(1) else col
+        cell_ids.append(canonical.replace("Aux_Voltage_", "Cell ").replace("(V)", ""))
+    return cell_ids
+
+
+def canonicalize_columns(df: DataFrame, registry: Optional[SchemaRegistry] = None) -> DataFrame:
+    """Renames the columns of a header variant to the canonical names used
+    by the analysis functions in main.py.
+
+    Args:
+        df (DataFrame): battery time series data
+        registry (SchemaRegistry, optional): registry to use, the in-memory
+            default registry if not given
+
+    Returns:
+        DataFrame: DataFrame with canonical column names
+    """
+    renaming = get_canonical_names(df.columns, registry)
+    if all(col == name for col, name in renaming.items()):
+        return df
+    return df.rename(columns=renaming)  # type: ignore
@@ -0,0 +1,85 @@
+from pandas import DataFrame
+import numpy as np
+import pandas as pd
+
+from loading import CURRENT_COL, DATE_TIME_COL, STEP_INDEX_COL
+from main import get_final_SOC, get_voltage_column_list
+
+
+def compact_dtypes(df: DataFrame, date_col: str = DATE_TIME_COL) -> DataFrame:
+    """Converts a battery time series to a compact dtype schema that the
+    functions in main.py accept:
+
+    - "Aux_Voltage_*" and "Current(A)" as float32
+    - "Step_Index" as the smallest integer type that holds all steps
+    - the time as datetime64[ns, UTC], which is stored as int64 epoch
+      nanoseconds, either in the index or in the date column
+
+    "Test_Time(s)" stays float64, because float32 cannot resolve seconds
+    over months of test time and the capacity integral depends on it.
+
+    Args:
+        df (DataFrame): battery time series data
+        date_col (str): name of the date column, if it is not the index
+
+    Returns:
+        DataFrame: copy of the data with compact dtypes
+    """
+    df = df.copy()
+    float32_cols = get_voltage_column_list(df)
+    if CURRENT_COL in df.columns:
+        float32_cols.append(CURRENT_COL)
+    for col in float32_cols:
+        df[col] = df[col].astype(np.float32)
+    if STEP_INDEX_COL in df.columns and not df[STEP_INDEX_COL].isna().any():
+        df[STEP_INDEX_COL] = pd.to_numeric(df[STEP_INDEX_COL], downcast="integer")  # type: ignore
+    if date_col in df.columns:
+        df[date_col] = pd.to_datetime(df[date_col], utc=True)  # type: ignore
+    elif df.index.name == date_col:
+        df.index = pd.to_datetime(df.index, utc=True)  # type: ignore
+    return df
+
+
+def get_memory_saving(df: DataFrame, compact_df: DataFrame) -> DataFrame:
+    """Compares the memory usage of a DataFrame before and after
+    compact_dtypes().
+
+    Args:
+        df (DataFrame): original battery time series data
+        compact_df (DataFrame): the same data with compact dtypes
+
+    Returns:
+        DataFrame: bytes per column before and after, the saved bytes,
+        and a "Total" row.
+    """
+    before = df.memory_usage(deep=True)
+    after = compact_df.memory_usage(deep=True)
+    report = DataFrame({"Before (B)": before, "After (B)": after})
+    report.loc["Total"] = report.sum()
+    report["Saved (B)"] = report["Before (B)"] - report["After (B)"]
+    report["Saved (%)"] = (100 * report["Saved (B)"] / report["Before (B)"]).round(1)
+    return report
+
+
+def check_compact_results(
+        df: DataFrame,
+        compact_df: DataFrame,
+        soc_atol: float = 1.0,
+        cap_rtol: float = 1e-3) -> bool:
+    """Checks that get_final_SOC() gives the same SOC and capacity values for
+    a capacity test in compact dtypes as for the original float64 data.
+
+    Args:
+        df (DataFrame): capacity test in the original dtypes
+        compact_df (DataFrame): the same capacity test after compact_dtypes()
+        soc_atol (float): allowed absolute SOC deviation in percent
+        cap_rtol (float): allowed relative capacity deviation
+
+    Returns:
+        bool: True if all cells are within tolerance
+    """
+    reference = get_final_SOC(df)
+    compact = get_final_SOC(compact_df)
+    soc_ok = np.allclose(compact["SOC (%)"], reference["SOC (%)"], rtol=0, atol=soc_atol)
+    cap_ok = np.allclose(compact["Capacity (Ah)"], reference["Capacity (Ah)"], rtol=cap_rtol)
+    return bool(soc_ok and cap_ok)
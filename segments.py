@@ -0,0 +1,111 @@
+from pandas import DataFrame
+from typing import List, Optional
+import numpy as np
+
+from loading import CURRENT_COL, STEP_INDEX_COL
+from main import get_capacity_list, get_min_cell_voltage
+from steps import get_step_runs
+
+
+def detect_discharge_segments(
+        df: DataFrame,
+        min_current: float = 0.1,
+        current_rtol: float = 0.05,
+        min_duration: float = 3600.0,
+        cutoff_voltage: Optional[float] = None,
+        col_name: str = STEP_INDEX_COL) -> DataFrame:
+    """Finds the constant-current discharge segments of a channel history,
+    e.g. the capacity tests, in one vectorized pass. Every contiguous run of
+    a step index is a candidate, see get_step_runs(). A run is a discharge
+    segment if its mean current is negative, the current stays within a
+    relative tolerance of the mean, it lasts long enough, and the lowest
+    cell voltage falls during the run.
+
+    Args:
+        df (DataFrame): channel history sorted by its DateTime index,
+            e.g. from merge_exports()
+        min_current (float): smallest discharge current in A
+        current_rtol (float): allowed standard deviation of the current
+            relative to the mean current
+        min_duration (float): shortest segment in seconds
+        cutoff_voltage (float, optional): only keep segments in which a cell
+            reaches this voltage, i.e. complete capacity tests
+        col_name (str): name of the step index column
+
+    Returns:
+        DataFrame: one row per segment with the columns of get_step_runs()
+        and "duration(s)", "current(A)" (mean current), "start_voltage(V)"
+        and "min_voltage(V)" (lowest cell voltage at the start and within
+        the segment)
+    """
+    runs = get_step_runs(df, col_name)
+    if len(runs) == 0:
+        return runs.assign(**{"duration(s)": [], "current(A)": [],
+                              "start_voltage(V)": [], "min_voltage(V)": []})
+    starts = runs["start_row"].to_numpy()
+    lengths = runs["stop_row"].to_numpy() - starts
+
+    current = np.nan_to_num(df[CURRENT_COL].to_numpy(dtype=np.float64))
+    mean_current = np.add.reduceat(current, starts) / lengths
+    mean_square = np.add.reduceat(current**2, starts) / lengths
+    std_current = np.sqrt(np.maximum(mean_square - mean_current**2, 0.0))
+
+    min_cell_voltage = get_min_cell_voltage(df)
+    start_voltage = min_cell_voltage[starts]
+    min_voltage = np.fmin.reduceat(min_cell_voltage, starts)
+
+    runs["duration(s)"] = (runs["stop_time"] - runs["start_time"]).to_numpy() / 1e9
+    runs["current(A)"] = mean_current
+    runs["start_voltage(V)"] = start_voltage
+    runs["min_voltage(V)"] = min_voltage
+
+    is_segment = ((mean_current <= -min_current)
+                  & (std_current <= current_rtol * np.abs(mean_current))
+                  & (runs["duration(s)"].to_numpy() >= min_duration)
+                  & (min_voltage < start_voltage))
+    if cutoff_voltage is not None:
+        is_segment &= min_voltage <= cutoff_voltage
+    return runs[is_segment].reset_index(drop=True)
+
+
+def get_segment_frames(df: DataFrame, segments: DataFrame) -> List[DataFrame]:
+    """Slices the detected segments out of the channel history.
+
+    Args:
+        df (DataFrame): channel history the segments were detected in
+        segments (DataFrame): segment table from detect_discharge_segments()
+
+    Returns:
+        List[DataFrame]: one DataFrame per segment, in time order
+    """
+    return [df.iloc[int(start):int(stop)]
+            for start, stop in zip(segments["start_row"], segments["stop_row"])]
+
+
+def get_history_capacity_list(
+        df: DataFrame,
+        min_current: float = 0.1,
+        current_rtol: float = 0.05,
+        min_duration: float = 3600.0,
+        cutoff_voltage: Optional[float] = None,
+        col_name: str = STEP_INDEX_COL) -> DataFrame:
+    """Runs get_capacity_list() on every capacity test of a channel history,
+    detected with detect_discharge_segments() instead of hard-coded time
+    intervals and step indices.
+
+    Args:
+        df (DataFrame): channel history sorted by its DateTime index
+        min_current (float): smallest discharge current in A
+        current_rtol (float): allowed standard deviation of the current
+            relative to the mean current
+        min_duration (float): shortest segment in seconds
+        cutoff_voltage (float, optional): only keep segments in which a cell
+            reaches this voltage
+        col_name (str): name of the step index column
+
+    Returns:
+        DataFrame: capacity of every cell in every detected capacity test
+    """
+    segments = detect_discharge_segments(df, min_current, current_rtol, min_duration,
+                                         cutoff_voltage, col_name)
+    return get_capacity_list(get_segment_frames(df, segments))
@@ -0,0 +1,194 @@
+from pandas import DataFrame
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from loading import STEP_INDEX_COL
+from merging import get_time_keys
+from timeindex import SortedTimeIndex
+
+
+def get_step_runs_from_arrays(steps: np.ndarray, keys: np.ndarray) -> DataFrame:  # type: ignore
+    """Finds every contiguous run of a step index in one vectorized pass.
+
+    Args:
+        steps (np.ndarray): step index of every row
+        keys (np.ndarray): int64 timestamp of every row
+
+    Returns:
+        DataFrame: one row per run, see get_step_runs()
+    """
+    steps = np.asarray(steps)
+    if len(steps) == 0:
+        starts = stops = np.empty(0, dtype=np.int64)
+    else:
+        starts = np.flatnonzero(np.r_[True, steps[1:] != steps[:-1]])
+        stops = np.r_[starts[1:], len(steps)]
+    runs = DataFrame({"step_index": steps[starts].astype(np.int64),
+                      "start_row": starts.astype(np.int64),
+                      "stop_row": stops.astype(np.int64),
+                      "start_time": np.asarray(keys)[starts].astype(np.int64),
+                      "stop_time": np.asarray(keys)[stops - 1].astype(np.int64)})
+    runs.insert(1, "occurrence", runs.groupby("step_index").cumcount().to_numpy(dtype=np.int64))
+    return runs
+
+
+def get_step_runs(df: DataFrame, col_name: str = STEP_INDEX_COL) -> DataFrame:
+    """Finds every contiguous run of a step index in one vectorized pass.
+
+    Args:
+        df (DataFrame): DataFrame with a DateTime index and a step index column
+        col_name (str): name of the step index column
+
+    Returns:
+        DataFrame: one row per run with the columns "step_index",
+        "occurrence" (counting the runs of each step index from 0),
+        "start_row", "stop_row" (positional, stop exclusive), and
+        "start_time", "stop_time" (int64 ns of the first and last sample)
+    """
+    return get_step_runs_from_arrays(df[col_name].to_numpy(), get_time_keys(df))
+
+
+class StepRunIndex:
+    """Step-run index of a DataFrame, built once with get_step_runs(). Step
+    isolation then slices the rows of the runs instead of scanning and
+    copying the whole DataFrame, and single occurrences of a step index
+    can be isolated instead of all runs merged together.
+
+    The index is only valid as long as the rows of the DataFrame are not
+    changed.
+
+    Args:
+        df (DataFrame): DataFrame with a DateTime index and a step index column
+        col_name (str): name of the step index column
+        sort (bool): sort unsorted data once by time, see SortedTimeIndex
+    """
+
+    def __init__(self, df: DataFrame, col_name: str = STEP_INDEX_COL, sort: bool = False) -> None:
+        self.time_index = SortedTimeIndex(df, sort)
+        self.df = self.time_index.df
+        self.col_name = col_name
+        self.runs = get_step_runs(self.df, col_name)
+        self._runs_by_step: Dict[int, DataFrame] = {
+            int(step_index): runs for step_index, runs in self.runs.groupby("step_index")}
+        self._rows_by_step: Dict[int, Tuple[np.ndarray, np.ndarray]] = {  # type: ignore
+            step_index: (runs["start_row"].to_numpy(), runs["stop_row"].to_numpy())
+            for step_index, runs in self._runs_by_step.items()}
+
+    def get_runs(self, step_index: int) -> DataFrame:
+        """Returns all runs of a step index.
+
+        Args:
+            step_index (int): Step Index Number
+
+        Returns:
+            DataFrame: runs of the step index, see get_step_runs()
+        """
+        runs = self._runs_by_step.get(step_index)
+        return self.runs.iloc[:0] if runs is None else runs
+
+    def _slice_runs(
+            self,
+            starts: np.ndarray,  # type: ignore
+            stops: np.ndarray,  # type: ignore
+            occurrence: Optional[int]) -> DataFrame:
+        if occurrence is not None:
+            if not -len(starts) <= occurrence < len(starts):
+                return self.df.iloc[:0]
+            starts, stops = starts[[occurrence]], stops[[occurrence]]
+        if len(starts) == 1:
+            return self.df.iloc[int(starts[0]):int(stops[0])]
+        if len(starts) == 0:
+            return self.df.iloc[:0]
+        lengths = stops - starts
+        offsets = np.cumsum(lengths) - lengths
+        rows = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        return self.df.iloc[rows]
+
+    def isolate_step_index(self, step_index: int, occurrence: Optional[int] = None) -> DataFrame:
+        """Isolates a step index like isolate_step_index() in main.py.
+
+        Args:
+            step_index (int): Step Index Number
+            occurrence (int, optional): only isolate the Nth run of the step
+                index (counting from 0, negative values count from the end)
+                instead of all runs merged together
+
+        Returns:
+            DataFrame: Dataframe with only the data for a specific step index.
+        """
+        starts, stops = self._rows_by_step.get(step_index, (np.empty(0, np.int64),) * 2)
+        return self._slice_runs(starts, stops, occurrence)
+
+    def isolate_step_index_in_timeinterval(
+            self,
+            start_date: str,
+            stop_date: str,
+            step_index: int,
+            occurrence: Optional[int] = None) -> DataFrame:
+        """Isolates a step index within a time interval like
+        isolate_step_index_in_timeinterval() in main.py. Runs crossing the
+        interval bounds are cut at the bounds.
+
+        Args:
+            start_date (str): starting date for interval
+            stop_date (str): stopping date for interval
+            step_index (int): step index for interval
+            occurrence (int, optional): only isolate the Nth run of the step
+                index within the interval
+
+        Raises:
+            ValueError: if the DataFrame is not sorted by time
+
+        Returns:
+            DataFrame: DataFrame that only contains a specific
+            step index within a time interval.
+        """
+        rows = self.time_index.get_row_range(start_date, stop_date)
+        starts, stops = self._rows_by_step.get(step_index, (np.empty(0, np.int64),) * 2)
+        first = np.searchsorted(stops, rows.start, side="right")
+        last = np.searchsorted(starts, rows.stop, side="left")
+        starts = np.maximum(starts[first:last], rows.start)
+        stops = np.minimum(stops[first:last], rows.stop)
+        return self._slice_runs(starts, stops, occurrence)
+
+    def isolate_many(
+            self,
+            queries: Sequence[Tuple[str, str, int]]) -> List[DataFrame]:
+        """Answers many isolate_step_index_in_timeinterval() queries with
+        binary searches on the already built index, so the cost per query
+        does not depend on the size of the DataFrame.
+
+        Args:
+            queries (Sequence[Tuple[str, str, int]]): (start_date, stop_date,
+                step_index) of every query
+
+        Returns:
+            List[DataFrame]: one DataFrame per query, in query order
+        """
+        return [self.isolate_step_index_in_timeinterval(start_date, stop_date, step_index)
+                for start_date, stop_date, step_index in queries]
+
+
+def batch_isolate_step_index_in_timeinterval(
+        df: DataFrame,
+        queries: Sequence[Tuple[str, str, int]],
+        step_col_name: str = STEP_INDEX_COL,
+        sort: bool = False) -> List[DataFrame]:
+    """Isolates many (start_date, stop_date, step_index) queries, like the
+    list of capacity tests in the notebook, with a single pass over the
+    DataFrame: the step-run index is built once and every query is answered
+    by binary search. Results equal isolate_step_index_in_timeinterval()
+    called for each query.
+
+    Args:
+        df (DataFrame): DataFrame with a DateTime index and a step index column
+        queries (Sequence[Tuple[str, str, int]]): (start_date, stop_date,
+            step_index) of every query
+        step_col_name (str): name of the step index column
+        sort (bool): sort unsorted data once by time instead of raising
+            an error
+
+    Returns:
+        List[DataFrame]: one DataFrame per query, in query order
+    """
+    return StepRunIndex(df, step_col_name, sort).isolate_many(queries)
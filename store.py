@@ -0,0 +1,253 @@
+from pandas import DataFrame, DatetimeIndex
+from typing import Dict, Iterator, List, Optional
+import json
+import os
+import numpy as np
+
+from loading import STEP_INDEX_COL, get_interval_bounds
+from merging import get_time_keys
+from steps import get_step_runs_from_arrays
+
+
+TIMESTAMP_FILE = "timestamps.npy"
+META_FILE = "meta.json"
+
+
+def write_array_store(df: DataFrame, directory: str) -> "ArrayStore":
+    """Writes every numeric column of a DataFrame with a DateTime index as
+    its own .npy file, together with a sorted int64 timestamp array.
+    The rows are sorted by time once while writing.
+
+    Args:
+        df (DataFrame): battery time series data with a DateTime index
+        directory (str): target directory of the store
+
+    Returns:
+        ArrayStore: the written store, opened memory-mapped
+    """
+    os.makedirs(directory, exist_ok=True)
+    timestamps = get_time_keys(df)
+    order = None
+    if not df.index.is_monotonic_increasing:
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+    np.save(os.path.join(directory, TIMESTAMP_FILE), timestamps)
+
+    files: Dict[str, str] = {}
+    for idx, col in enumerate(df.columns):
+        values = df[col].to_numpy()
+        if values.dtype.kind not in "biuf":
+            continue
+        if order is not None:
+            values = values[order]
+        file_name = f"col_{idx:03d}.npy"
+        np.save(os.path.join(directory, file_name), values)
+        files[str(col)] = file_name
+
+    index: DatetimeIndex = df.index  # type: ignore
+    meta = {"columns": files,
+            "index_name": index.name,
+            "tz": str(index.tz) if index.tz is not None else None}
+    with open(os.path.join(directory, META_FILE), "w") as file:
+        json.dump(meta, file)
+    return ArrayStore(directory)
+
+
+class ArrayView:
+    """Zero-copy view of a row range of an ArrayStore.
+
+    Args:
+        store (ArrayStore): store the view belongs to
+        start (int): first row of the view
+        stop (int): row after the last row of the view
+    """
+
+    def __init__(self, store: "ArrayStore", start: int, stop: int) -> None:
+        self.store = store
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, col: str) -> np.ndarray:  # type: ignore
+        return self.store.column(col)[self.start:self.stop]
+
+    @property
+    def timestamps(self) -> np.ndarray:  # type: ignore
+        return self.store.timestamps[self.start:self.stop]
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> DataFrame:
+        """Materializes the view as a DataFrame with a DateTime index, as
+        used by the functions in main.py.
+
+        Args:
+            columns (List[str], optional): columns to include, all by default
+
+        Returns:
+            DataFrame: copy of the viewed rows
+        """
+        if columns is None:
+            columns = self.store.columns
+        index = DatetimeIndex(np.asarray(self.timestamps).view("M8[ns]"),
+                              name=self.store.index_name)
+        if self.store.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.store.tz)
+        return DataFrame({col: np.asarray(self[col]) for col in columns},
+                         index=index, columns=columns)
+
+
+class ArrayStore:
+    """Storage backend keeping every column of a battery time series as a
+    memory-mapped array on disk. Several processes opening the same store
+    share the operating system's page cache instead of holding private
+    copies. Use write_array_store() to create a store.
+
+    Args:
+        directory (str): directory of the store
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE)) as file:
+            meta = json.load(file)
+        self._files: Dict[str, str] = meta["columns"]
+        self.index_name: Optional[str] = meta["index_name"]
+        self.tz: Optional[str] = meta["tz"]
+        self._arrays: Dict[str, np.ndarray] = {}  # type: ignore
+        self._step_runs: Dict[str, DataFrame] = {}
+        self.timestamps: np.ndarray = np.load(  # type: ignore
+            os.path.join(directory, TIMESTAMP_FILE), mmap_mode="r")
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._files)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def column(self, col: str) -> np.ndarray:  # type: ignore
+        """Returns the memory-mapped array of a column.
+
+        Args:
+            col (str): column name
+
+        Returns:
+            np.ndarray: read-only memory-mapped array
+        """
+        if col not in self._arrays:
+            self._arrays[col] = np.load(
+                os.path.join(self.directory, self._files[col]), mmap_mode="r")
+        return self._arrays[col]
+
+    def get_row_range(self, start_date: Optional[str], stop_date: Optional[str]) -> slice:
+        """Finds the rows within a time interval by binary search on the
+        sorted timestamps.
+
+        Args:
+            start_date (str, optional): start date for interval
+            stop_date (str, optional): stop date for interval
+
+        Returns:
+            slice: positional row range
+        """
+        start, stop = get_interval_bounds(start_date, stop_date)
+        start_row = 0 if start is None else int(
+            np.searchsorted(self.timestamps, start.value, side="left"))
+        stop_row = len(self) if stop is None else int(
+            np.searchsorted(self.timestamps, stop.value, side="right"))
+        return slice(start_row, max(start_row, stop_row))
+
+    def isolate_timeinterval(
+            self,
+            start_date: Optional[str],
+            stop_date: Optional[str]) -> ArrayView:
+        """Isolates a time interval, like isolate_timeinterval() in main.py,
+        without copying any data.
+
+        Args:
+            start_date (str, optional): start date for interval
+            stop_date (str, optional): stop date for interval
+
+        Returns:
+            ArrayView: view of the time interval
+        """
+        rows = self.get_row_range(start_date, stop_date)
+        return ArrayView(self, rows.start, rows.stop)
+
+    def get_step_runs(self, col_name: str = STEP_INDEX_COL) -> DataFrame:
+        """Returns the step-run index of the store, see get_step_runs().
+        It is built on the first call and reused afterwards.
+
+        Args:
+            col_name (str): name of the step index column
+
+        Returns:
+            DataFrame: one row per contiguous run of a step index
+        """
+        if col_name not in self._step_runs:
+            self._step_runs[col_name] = get_step_runs_from_arrays(
+                self.column(col_name), self.timestamps)
+        return self._step_runs[col_name]
+
+    def iter_step_runs(
+            self,
+            step_index: int,
+            rows: slice = slice(None),
+            col_name: str = STEP_INDEX_COL) -> Iterator[ArrayView]:
+        """Yields a view for every contiguous run of a step index, using the
+        step-run index of the store.
+
+        Args:
+            step_index (int): Step Index Number
+            rows (slice): positional row range to search in
+            col_name (str): name of the step index column
+
+        Yields:
+            ArrayView: view of one run of the step index
+        """
+        start_row = rows.start or 0
+        stop_row = len(self) if rows.stop is None else rows.stop
+        runs = self.get_step_runs(col_name)
+        runs = runs[(runs["step_index"].to_numpy() == step_index)
+                    & (runs["stop_row"].to_numpy() > start_row)
+                    & (runs["start_row"].to_numpy() < stop_row)]
+        for run_start, run_stop in zip(runs["start_row"], runs["stop_row"]):
+            yield ArrayView(self, max(int(run_start), start_row), min(int(run_stop), stop_row))
+
+    def isolate_step_index(
+            self,
+            step_index: int,
+            col_name: str = STEP_INDEX_COL) -> List[ArrayView]:
+        """Isolates a step index, like isolate_step_index() in main.py.
+        Because the rows of a step index are not contiguous in general,
+        one zero-copy view is returned per contiguous run.
+
+        Args:
+            step_index (int): Step Index Number
+            col_name (str): name of the step index column
+
+        Returns:
+            List[ArrayView]: views of all runs of the step index
+        """
+        return list(self.iter_step_runs(step_index, col_name=col_name))
+
+    def isolate_step_index_in_timeinterval(
+            self,
+            start_date: Optional[str],
+            stop_date: Optional[str],
+            step_index: int,
+            step_col_name: str = STEP_INDEX_COL) -> List[ArrayView]:
+        """Isolates all runs of a step index within a time interval.
+
+        Args:
+            start_date (str, optional): start date for interval
+            stop_date (str, optional): stop date for interval
+            step_index (int): Step Index Number
+            step_col_name (str): name of the step index column
+
+        Returns:
+            List[ArrayView]: views of all runs of the step index
+        """
+        rows = self.get_row_range(start_date, stop_date)
+        return list(self.iter_step_runs(step_index, rows, step_col_name))
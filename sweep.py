@@ -0,0 +1,89 @@
+from pandas import DataFrame, MultiIndex
+from typing import Sequence
+import numpy as np
+
+from loading import CURRENT_COL, TEST_TIME_COL
+from main import get_min_cell_voltage, get_nearest_rows, get_voltage_column_list
+from registry import get_cell_ids
+
+
+def get_cutoff_rows(
+        min_voltage: np.ndarray,  # type: ignore
+        cutoff_voltages: Sequence[float],
+        debounce: int = 1) -> np.ndarray:  # type: ignore
+    """Finds the first crossing of every cutoff voltage at once, like
+    get_cutoff_row() for each cutoff. The crossings are looked up by binary
+    search in the running minimum of the (debounced) lowest cell voltage.
+
+    Args:
+        min_voltage (np.ndarray): row-wise minimum of the cell voltages,
+            see get_min_cell_voltage()
+        cutoff_voltages (Sequence[float]): cutoff voltages
+        debounce (int): number of consecutive samples that have to be
+            below a cutoff voltage
+
+    Returns:
+        np.ndarray: first row of the crossing of every cutoff voltage, or
+        the number of rows if it is never reached
+    """
+    min_voltage = np.asarray(min_voltage, dtype=np.float64)
+    n_rows = len(min_voltage)
+    if debounce > 1:
+        if n_rows < debounce:
+            return np.full(len(cutoff_voltages), n_rows, dtype=np.int64)
+        # a window is below a cutoff if its highest sample is below it
+        min_voltage = np.lib.stride_tricks.sliding_window_view(min_voltage, debounce).max(axis=1)
+    running_min = np.minimum.accumulate(np.nan_to_num(min_voltage, nan=np.inf))
+    rows = np.searchsorted(-running_min, -np.asarray(cutoff_voltages, dtype=np.float64),
+                           side="right").astype(np.int64)
+    rows[rows == len(running_min)] = n_rows
+    return rows
+
+
+def sweep_cutoff_voltages(
+        df: DataFrame,
+        cutoff_voltages: Sequence[float],
+        debounce: int = 1) -> DataFrame:
+    """Evaluates a capacity test at several cutoff voltages in one pass.
+    The crossings of all cutoffs are found in a single minimum voltage
+    trace, and the capacity of the cell that reaches the cutoff first is
+    read from one cumulative trapezoidal integral of the current. The result
+    for each cutoff equals get_final_SOC() of the test trimmed with
+    trim_to_cutoff_voltage(first_crossing=True).
+
+    Args:
+        df (DataFrame): dataframe containing a capacity test.
+        cutoff_voltages (Sequence[float]): cutoff voltages to evaluate
+        debounce (int): number of consecutive samples that have to be
+            below a cutoff voltage
+
+    Returns:
+        DataFrame: "SOC (%)" and "Capacity (Ah)" of every cell, indexed by
+        "Cutoff (V)" and "Cell ID". Cutoffs reached in the first row are NaN.
+    """
+    voltage_cols = get_voltage_column_list(df)
+    voltages = df[voltage_cols].to_numpy(dtype=np.float64)
+    rows = get_cutoff_rows(get_min_cell_voltage(df), cutoff_voltages, debounce)
+
+    current = df[CURRENT_COL].to_numpy(dtype=np.float64)
+    test_time = df[TEST_TIME_COL].to_numpy(dtype=np.float64)
+    charge = np.r_[0.0, np.cumsum((current[1:] + current[:-1]) / 2.0 * np.diff(test_time))]
+
+    n_cells = len(voltage_cols)
+    soc = np.full((len(rows), n_cells), np.nan)
+    capacity = np.full((len(rows), n_cells), np.nan)
+    for idx, n_rows in enumerate(rows):
+        if n_rows == 0:
+            continue
+        final_voltages = voltages[n_rows - 1]
+        ref_voltage = voltages[:n_rows, np.argmin(np.nan_to_num(final_voltages, nan=np.inf))]
+        ref_soc = np.linspace(100, 0, n_rows, endpoint=True).round(3)
+        ref_rows = get_nearest_rows(ref_voltage, final_voltages)
+        soc[idx] = np.where(ref_rows >= 0, ref_soc[ref_rows], np.nan)
+        smallest_cap = -charge[n_rows - 1] / 3600
+        capacity[idx] = smallest_cap + smallest_cap * soc[idx] / 100
+
+    cell_ids = get_cell_ids(voltage_cols)
+    index = MultiIndex.from_product([list(cutoff_voltages), cell_ids],
+                                    names=["Cutoff (V)", "Cell ID"])
+    return DataFrame({"SOC (%)": soc.ravel(), "Capacity (Ah)": capacity.ravel()}, index=index)
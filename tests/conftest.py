@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_export(path, start="2021-01-20 00:00:00", n_rows=4000, n_cells=4, seed=0,
+                freq_s=10.0, date_format="%m/%d/%Y %H:%M:%S"):
+    """Writes a synthetic cycler export with 20 step runs, discharging in
+    every third step, and slowly falling cell voltages."""
+    rng = np.random.default_rng(seed)
+    test_time = np.arange(n_rows) * freq_s
+    date_time = pd.Timestamp(start) + pd.to_timedelta(test_time, unit="s")
+    step = np.repeat(np.arange(1, 21), -(-n_rows // 20))[:n_rows]
+    current = np.where(step % 3 == 1, -2.0, np.where(step % 3 == 2, 1.0, 0.0))
+    df = pd.DataFrame({"Data_Point": np.arange(1, n_rows + 1),
+                       "Date_Time": date_time.strftime(date_format),
+                       "Test_Time(s)": test_time,
+                       "Step_Index": step,
+                       "Current(A)": current,
+                       "Voltage(V)": 12 + rng.normal(0, 0.01, n_rows)})
+    for cell in range(1, n_cells + 1):
+        df[f"Aux_Voltage_{cell}(V)"] = (2.1 - np.linspace(0, 0.4, n_rows) - rng.uniform(0, 0.02)
+                                        + rng.normal(0, 0.001, n_rows))
+    df["Aux_Temperature_1(C)"] = 25.0
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def export_paths(tmp_path):
+    """Three exports; the second overlaps the first and third."""
+    return [make_export(tmp_path / "a.csv"),
+            make_export(tmp_path / "c.csv", start="2021-01-20 08:00:00", seed=2),
+            make_export(tmp_path / "b.csv", start="2021-01-21 00:00:00", seed=1)]
+
+
+@pytest.fixture
+def export_frames(export_paths):
+    from cache import read_export
+    return [read_export(path) for path in export_paths]
+
+
+def make_xlsx(path, csv_path, sheet_name="Channel_1", renaming=None):
+    """Writes a CSV export as a sheet of an Excel workbook, after a sheet
+    without channel data."""
+    df = pd.read_csv(csv_path).rename(columns=renaming or {})
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame({"Info": ["summary"]}).to_excel(writer, sheet_name="Info", index=False)
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return str(path)
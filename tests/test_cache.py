@@ -0,0 +1,57 @@
+import os
+import time
+
+import pandas as pd
+
+from cache import ExportCache, get_file_fingerprint, read_export
+
+
+def count_parquet_files(cache_dir):
+    return len([name for name in os.listdir(cache_dir) if name.endswith(".parquet")])
+
+
+def test_cache_hit_and_miss(tmp_path, export_paths):
+    cache = ExportCache(str(tmp_path / "cache"))
+    assert cache.get(export_paths[0]) is None
+    df = cache.load(export_paths[0])
+    pd.testing.assert_frame_equal(cache.get(export_paths[0]), df)
+    pd.testing.assert_frame_equal(df, read_export(export_paths[0]))
+    assert list(cache.get(export_paths[0], columns=["Current(A)"]).columns) == ["Current(A)"]
+
+
+def test_changed_file_is_parsed_again(tmp_path, export_paths):
+    cache = ExportCache(str(tmp_path / "cache"))
+    cache.load(export_paths[0])
+    fingerprint = get_file_fingerprint(export_paths[0])
+    with open(export_paths[0], "a") as file:
+        file.write(open(export_paths[0]).read().split("\n")[-2] + "\n")
+    assert get_file_fingerprint(export_paths[0]) != fingerprint
+    assert cache.get(export_paths[0]) is None
+
+
+def test_cache_eviction(tmp_path, export_paths):
+    cache = ExportCache(str(tmp_path / "cache"), max_bytes=1)
+    for path in export_paths:
+        cache.load(path)
+    assert count_parquet_files(cache.cache_dir) == 0
+    assert cache.size() == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, export_paths):
+    cache = ExportCache(str(tmp_path / "cache"))
+    cache.load(export_paths[0])
+    time.sleep(0.01)
+    cache.load(export_paths[1])
+    time.sleep(0.01)
+    cache.get(export_paths[0])
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert cache.get(export_paths[0]) is not None
+    assert cache.get(export_paths[1]) is None
+
+
+def test_clear(tmp_path, export_paths):
+    cache = ExportCache(str(tmp_path / "cache"))
+    cache.load(export_paths[0])
+    cache.clear()
+    assert cache.size() == 0 and count_parquet_files(cache.cache_dir) == 0
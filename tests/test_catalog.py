@@ -0,0 +1,61 @@
+import pandas as pd
+
+from catalog import Catalog
+from conftest import make_export
+from main import get_final_SOC, isolate_step_index, trim_to_cutoff_voltage
+
+
+def test_find_steps(export_paths, export_frames):
+    catalog = Catalog()
+    catalog.add_file("ch1", export_paths[0], export_frames[0])
+    catalog.add_file("ch2", export_paths[2], export_frames[2])
+    steps = catalog.find_steps(step_index=4)
+    assert steps["channel"].tolist() == ["ch1", "ch2"]
+    steps = catalog.find_steps("ch2", 4, "2021-01-21", "2021-01-21")
+    assert len(steps) == 1
+    assert steps["start_time"].iloc[0] == isolate_step_index(export_frames[2], 4).index[0]
+    assert catalog.find_steps("ch1", 4, "2021-01-21", "2021-01-22").empty
+
+
+def test_load_step(export_paths, export_frames):
+    catalog = Catalog()
+    catalog.add_file("ch1", export_paths[0], export_frames[0])
+    step_id = int(catalog.find_steps("ch1", 7)["id"].iloc[0])
+    df = catalog.load_step(step_id, lambda path: export_frames[0])
+    pd.testing.assert_frame_equal(df, isolate_step_index(export_frames[0], 7))
+
+
+def test_results(export_paths, export_frames):
+    catalog = Catalog()
+    catalog.add_file("ch1", export_paths[0], export_frames[0])
+    step_id = int(catalog.find_steps("ch1", 7)["id"].iloc[0])
+    soc_df = get_final_SOC(trim_to_cutoff_voltage(isolate_step_index(export_frames[0], 7), 1.95))
+    catalog.add_result(step_id, soc_df, 1.95)
+    results = catalog.get_results("ch1", 7)
+    assert results["cell"].tolist() == ["Cell 1", "Cell 2", "Cell 3", "Cell 4"]
+    assert results["capacity"].tolist() == soc_df["Capacity (Ah)"].tolist()
+    assert (results["cutoff_voltage"] == 1.95).all()
+    assert catalog.get_results("ch1", 4).empty
+
+
+def test_grown_export_keeps_its_results(tmp_path):
+    path = tmp_path / "live.csv"
+    lines = open(make_export(path, n_rows=4000)).read().splitlines()
+    path.write_text("\n".join(lines[:1001]) + "\n")
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    file_id = catalog.add_file("ch1", str(path))
+    step_ids = catalog.find_steps("ch1", 4)["id"].tolist()
+    catalog.add_result(step_ids[0], pd.DataFrame({"SOC (%)": [1.0], "Capacity (Ah)": [2.0]},
+                                                 index=["Cell 1"]))
+
+    path.write_text("\n".join(lines) + "\n")
+    assert catalog.add_file("ch1", str(path)) == file_id
+    steps = catalog.find_steps("ch1")
+    assert len(steps) == 20 and steps["stop_row"].iloc[-1] == 4000
+    assert catalog.find_steps("ch1", 4)["id"].tolist() == step_ids
+    assert catalog.get_results("ch1")["step_id"].tolist() == step_ids
+
+    path.write_text("\n".join(lines[:1] + lines[201:]) + "\n")  # a different export
+    catalog.add_file("ch1", str(path))
+    assert len(catalog.find_steps("ch1")) == 19
+    assert catalog.get_results("ch1").empty
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from dataset import PartitionedDataset, write_partitioned_dataset
+from main import isolate_step_index_in_timeinterval, isolate_timeinterval
+from merging import merge_exports
+
+
+@pytest.fixture
+def history(export_frames):
+    return merge_exports([export_frames[0], export_frames[2]])
+
+
+def test_partitions_per_day(tmp_path, history):
+    write_partitioned_dataset(history, str(tmp_path / "ds"), "ch", freq="D")
+    dataset = PartitionedDataset(str(tmp_path / "ds"))
+    assert dataset.channels == ["ch"]
+    assert len(dataset.get_partition_files("ch")) == 2
+    assert len(dataset.get_partition_files("ch", "2021-01-21", "2021-01-21")) == 1
+    pd.testing.assert_frame_equal(dataset.load("ch"), history, check_freq=False)
+
+
+def test_partition_append_does_not_duplicate(tmp_path, export_frames):
+    df = export_frames[0]
+    assert write_partitioned_dataset(df, str(tmp_path / "ds"), "ch") == 0
+    assert write_partitioned_dataset(df, str(tmp_path / "ds"), "ch") == len(df)
+    loaded = PartitionedDataset(str(tmp_path / "ds")).load("ch")
+    assert len(loaded) == len(df)
+
+
+def test_isolation_equals_main(tmp_path, history):
+    write_partitioned_dataset(history, str(tmp_path / "ds"), "ch", freq="D")
+    dataset = PartitionedDataset(str(tmp_path / "ds"))
+    pd.testing.assert_frame_equal(
+        dataset.isolate_timeinterval("ch", "2021-01-21 02:00", "2021-01-21 03:00"),
+        isolate_timeinterval(history, "2021-01-21 02:00", "2021-01-21 03:00"), check_freq=False)
+    pd.testing.assert_frame_equal(
+        dataset.isolate_step_index_in_timeinterval("ch", "2021-01-20", "2021-01-21", 7),
+        isolate_step_index_in_timeinterval(history, "2021-01-20", "2021-01-21", 7),
+        check_freq=False)
+    assert dataset.isolate_timeinterval("ch", "2030-01-01", "2030-01-02").empty
+
+
+def test_unsupported_frequency(tmp_path, history):
+    with pytest.raises(ValueError):
+        write_partitioned_dataset(history, str(tmp_path / "ds"), "ch", freq="Y")
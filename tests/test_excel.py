@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+import excel
+from cache import ExportCache
+from conftest import make_xlsx
+from excel import get_channel_sheets, load_xlsx_cached, read_xlsx_chunks, read_xlsx_filtered
+from main import isolate_step_index_in_timeinterval
+
+RENAMING = {"Date_Time": "Date Time", "Test_Time(s)": "Test Time (s)", "Step_Index": "Step Index",
+            "Aux_Voltage_1(V)": "Aux Voltage 1 (V)"}
+
+
+@pytest.fixture
+def xlsx_path(tmp_path, export_paths):
+    return make_xlsx(tmp_path / "export.xlsx", export_paths[0], renaming=RENAMING)
+
+
+def test_channel_sheets(xlsx_path):
+    assert get_channel_sheets(xlsx_path) == ["Channel_1"]
+
+
+def test_filtered_read_equals_csv(xlsx_path, export_frames):
+    df = read_xlsx_filtered(xlsx_path, None, "2021-01-20", "2021-01-20", 4, chunksize=300)
+    expected = isolate_step_index_in_timeinterval(export_frames[0], "2021-01-20", "2021-01-20", 4)
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+
+def test_chunks_are_projected_and_filtered(xlsx_path):
+    chunks = list(read_xlsx_chunks(xlsx_path, "Channel_1", step_index=7, chunksize=100,
+                                   columns=["Aux_Voltage_1(V)"]))
+    assert len(chunks) == 2
+    assert all(list(chunk.columns) == ["Step_Index", "Aux_Voltage_1(V)"] for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 200
+
+
+def test_empty_result_keeps_the_columns(xlsx_path):
+    df = read_xlsx_filtered(xlsx_path, start_date="2030-01-01", stop_date="2030-01-02",
+                            columns=["Current(A)"])
+    assert len(df) == 0
+    assert list(df.columns) == ["Current(A)"] and df.index.name == "Date_Time"
+
+
+def test_cached_sheet(tmp_path, xlsx_path, export_frames, monkeypatch):
+    cache = ExportCache(str(tmp_path / "cache"))
+    df = load_xlsx_cached(cache, xlsx_path)
+    pd.testing.assert_frame_equal(df, export_frames[0], check_dtype=False, check_freq=False)
+
+    def read_xlsx_filtered(*args):
+        raise AssertionError("the sheet should come from the cache")
+
+    monkeypatch.setattr(excel, "read_xlsx_filtered", read_xlsx_filtered)
+    pd.testing.assert_frame_equal(load_xlsx_cached(cache, xlsx_path, "Channel_1"), df)
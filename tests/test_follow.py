@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from follow import ExportFollower
+from loading import read_csv_filtered
+from main import get_smallest_cap_cell
+
+
+def test_follower_matches_complete_read(tmp_path, export_paths):
+    lines = open(export_paths[0]).read().split("\n")
+    live_path = tmp_path / "live.csv"
+    live_path.write_text("")
+    follower = ExportFollower(str(live_path), step_index=1)
+    assert len(follower.poll()) == 0
+    for cut in [0, 5, 150, 151, 1200, len(lines) - 2]:
+        # the last line is still being written
+        live_path.write_text("\n".join(lines[:cut + 1]) + "\n1,partial")
+        follower.poll()
+    live_path.write_text("\n".join(lines))
+    follower.poll()
+
+    expected = read_csv_filtered(export_paths[0], step_index=1)
+    pd.testing.assert_frame_equal(follower.frame, expected, check_dtype=False)
+    assert np.isclose(follower.capacity, get_smallest_cap_cell(expected))
+
+
+def test_frame_is_not_copied_between_polls(tmp_path, export_paths):
+    lines = open(export_paths[0]).read().split("\n")
+    live_path = tmp_path / "live.csv"
+    live_path.write_text("\n".join(lines[:101]) + "\n")
+    follower = ExportFollower(str(live_path))
+    follower.poll()
+    first = follower.frame
+    with open(live_path, "a") as file:
+        file.write("\n".join(lines[101:201]) + "\n")
+    follower.poll()
+    second = follower.frame
+    assert len(first) == 100 and len(second) == 200
+    assert np.shares_memory(first["Current(A)"].to_numpy(), second["Current(A)"].to_numpy())
@@ -0,0 +1,54 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import ExportCache
+from conftest import make_export
+from ingest import DropDirectoryWatcher
+
+
+def count_parquet_files(cache_dir):
+    return len([name for name in os.listdir(cache_dir) if name.endswith(".parquet")])
+
+
+def test_concurrent_loads_keep_the_manifest_complete(tmp_path):
+    paths = [make_export(tmp_path / f"export_{idx}.csv", n_rows=200, start=f"2021-01-{idx + 1:02d}")
+             for idx in range(16)]
+    cache = ExportCache(str(tmp_path / "cache"))
+    with ProcessPoolExecutor(max_workers=8) as executor:
+        list(executor.map(cache.load, paths))
+    assert len(cache._read_manifest()) == count_parquet_files(cache.cache_dir) == len(paths)
+
+
+def test_watcher_ingests_stable_files(tmp_path):
+    drop_dir = tmp_path / "drop"
+    drop_dir.mkdir()
+    paths = [make_export(drop_dir / f"export_{idx}.csv", n_rows=200, start=f"2021-01-{idx + 1:02d}")
+             for idx in range(12)]
+    cache = ExportCache(str(tmp_path / "cache"))
+    watcher = DropDirectoryWatcher(str(drop_dir), cache, max_concurrency=4)
+
+    async def run_twice():
+        first = await watcher.run_once()
+        return first, await watcher.run_once()
+
+    first, second = asyncio.run(run_twice())
+    assert first == []  # files are only ingested once they did not change between two scans
+    assert second == sorted(paths)
+    assert watcher.errors == {}
+    assert len(cache._read_manifest()) == count_parquet_files(cache.cache_dir) == len(paths)
+
+
+def test_watcher_records_errors(tmp_path):
+    drop_dir = tmp_path / "drop"
+    drop_dir.mkdir()
+    bad_path = drop_dir / "bad.csv"
+    bad_path.write_text('x\n"unterminated\n')
+    watcher = DropDirectoryWatcher(str(drop_dir), ExportCache(str(tmp_path / "cache")))
+
+    async def run_twice():
+        await watcher.run_once()
+        return await watcher.run_once()
+
+    assert asyncio.run(run_twice()) == []
+    assert list(watcher.errors) == [str(bad_path)]
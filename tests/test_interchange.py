@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from interchange import (frame_to_record_batch, iter_store_record_batches, read_ipc_file,
+                         record_batch_to_frame, view_to_record_batch, write_ipc_file)
+from store import write_array_store
+
+
+def make_frame():
+    index = pd.date_range("2021-01-01", periods=5, freq="s", tz="UTC", name="Date_Time")
+    return pd.DataFrame({"Flag": [True, False, True, True, False],
+                         "Step_Index": np.arange(5, dtype=np.int16),
+                         "Current(A)": np.linspace(-1, 1, 5),
+                         "Aux_Voltage_1(V)": np.linspace(2, 1.8, 5, dtype=np.float32)},
+                        index=index)
+
+
+def test_frame_round_trip():
+    df = make_frame()
+    pd.testing.assert_frame_equal(record_batch_to_frame(frame_to_record_batch(df)), df,
+                                  check_freq=False)
+
+
+def test_numeric_columns_are_not_copied():
+    df = make_frame()
+    batch = frame_to_record_batch(df)
+    values = df["Current(A)"].to_numpy()
+    assert batch.column(3).buffers()[1].address == values.__array_interface__["data"][0]
+
+
+def test_store_view_round_trip(tmp_path):
+    df = make_frame()
+    store = write_array_store(df, str(tmp_path / "store"))
+    view = store.isolate_timeinterval(None, None)
+    pd.testing.assert_frame_equal(record_batch_to_frame(view_to_record_batch(view)), df,
+                                  check_freq=False)
+    batches = list(iter_store_record_batches(store, max_rows=2))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+
+
+def test_ipc_file_round_trip(tmp_path):
+    df = make_frame()
+    write_ipc_file(str(tmp_path / "data.arrow"), df)
+    pd.testing.assert_frame_equal(read_ipc_file(str(tmp_path / "data.arrow")), df,
+                                  check_freq=False)
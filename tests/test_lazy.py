@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from cache import ExportCache
+from conftest import make_xlsx
+from dataset import PartitionedDataset, write_partitioned_dataset
+from lazy import (ArrayStoreSource, CachedSource, CsvSource, DatasetSource, LazyFrame,
+                  XlsxSource)
+from main import isolate_step_index_in_timeinterval
+from store import write_array_store
+
+COLUMNS = ["Test_Time(s)", "Current(A)", "Aux_Voltage_1(V)"]
+
+
+def make_source(name, tmp_path, path, df):
+    if name == "csv":
+        return CsvSource(path, chunksize=500)
+    if name == "cached":
+        return CachedSource(path, ExportCache(str(tmp_path / "cache")))
+    if name in ("xlsx", "cached_xlsx"):
+        xlsx_path = make_xlsx(tmp_path / "export.xlsx", path)
+        return XlsxSource(xlsx_path, cache=ExportCache(str(tmp_path / "cache"))
+                          if name == "cached_xlsx" else None)
+    if name == "dataset":
+        write_partitioned_dataset(df, str(tmp_path / "ds"), "ch", freq="D")
+        return DatasetSource(PartitionedDataset(str(tmp_path / "ds")), "ch")
+    return ArrayStoreSource(write_array_store(df, str(tmp_path / "store")))
+
+
+SOURCES = ["csv", "cached", "xlsx", "cached_xlsx", "dataset", "array_store"]
+
+
+@pytest.mark.parametrize("name", SOURCES)
+def test_to_frame_equals_main(tmp_path, export_paths, export_frames, name):
+    source = make_source(name, tmp_path, export_paths[0], export_frames[0])
+    lazy = LazyFrame(source).isolate_timeinterval("2021-01-20 01:00", "2021-01-20 09:00")
+    df = lazy.isolate_step_index(4).select(COLUMNS).to_frame()
+    expected = isolate_step_index_in_timeinterval(
+        export_frames[0], "2021-01-20 01:00", "2021-01-20 09:00", 4)[COLUMNS]
+    # Excel stores whole numbers as integers
+    pd.testing.assert_frame_equal(df, expected, check_freq=False, check_dtype="xlsx" not in name)
+
+
+@pytest.mark.parametrize("name", SOURCES)
+def test_conflicting_steps_only_read_the_schema(tmp_path, export_paths, export_frames, name,
+                                                monkeypatch):
+    source = make_source(name, tmp_path, export_paths[0], export_frames[0])
+    if name in ("cached", "cached_xlsx"):
+        LazyFrame(source).isolate_step_index(1).to_frame()  # fill the cache
+
+    def read(*args):
+        raise AssertionError("no rows should be read")
+
+    monkeypatch.setattr(source, "read", read)
+    df = LazyFrame(source).isolate_step_index(4).isolate_step_index(7).select(COLUMNS).to_frame()
+    assert len(df) == 0
+    assert list(df.columns) == COLUMNS
+    assert df.index.name == "Date_Time"
+
+
+def test_filters_are_pushed_down_once(export_paths):
+    calls = []
+
+    class RecordingSource:
+        def read(self, *args):
+            calls.append(args)
+            return pd.DataFrame()
+
+    lazy = LazyFrame(RecordingSource()).isolate_timeinterval("2021-01-20", "2021-01-25")
+    lazy = lazy.isolate_step_index_in_timeinterval("2021-01-22", "2021-01-28", 4).select(COLUMNS)
+    lazy.select(["Current(A)", "Voltage(V)"]).to_frame()
+    assert calls == [("2021-01-22", "2021-01-25", 4, "Step_Index", ["Current(A)"])]
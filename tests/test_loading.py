@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import loading
+from loading import (detect_date_format, get_interval_bounds, get_required_columns, parse_date_time,
+                     read_csv_chunks, read_csv_filtered, read_csv_for_analysis, read_header)
+from main import (get_final_SOC, isolate_step_index, isolate_step_index_in_timeinterval,
+                  isolate_timeinterval, trim_to_cutoff_voltage)
+
+
+@pytest.fixture(autouse=True)
+def clear_date_format_cache():
+    loading._date_format_cache.clear()
+    yield
+    loading._date_format_cache.clear()
+
+
+def write_dates(path, start, date_format, with_test_time=True, n_rows=50):
+    test_time = np.arange(n_rows) * 10.0
+    date_time = pd.Timestamp(start) + pd.to_timedelta(test_time, unit="s")
+    data = {"Date_Time": date_time.strftime(date_format), "Step_Index": 1}
+    if with_test_time:
+        data["Test_Time(s)"] = test_time
+    pd.DataFrame(data).to_csv(path, index=False)
+    return str(path), pd.DatetimeIndex(date_time, name="Date_Time").tz_localize("UTC")
+
+
+def test_interval_bounds_include_the_whole_stop_day():
+    start, stop = get_interval_bounds("2021-01-22", "2021-01-28")
+    assert start == pd.Timestamp("2021-01-22", tz="UTC")
+    assert stop == pd.Timestamp("2021-01-28 23:59:59.999999999", tz="UTC")
+
+
+@pytest.mark.parametrize("chunksize", [100, 1000, 100_000])
+def test_filtered_read_equals_isolation(export_paths, export_frames, chunksize):
+    df = read_csv_filtered(export_paths[0], "2021-01-20", "2021-01-20", 4, chunksize=chunksize)
+    expected = isolate_step_index_in_timeinterval(export_frames[0], "2021-01-20", "2021-01-20", 4)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_filtered_read_of_time_interval(export_paths, export_frames):
+    df = read_csv_filtered(export_paths[0], "2021-01-20 02:00", "2021-01-20 03:00", chunksize=300)
+    pd.testing.assert_frame_equal(
+        df, isolate_timeinterval(export_frames[0], "2021-01-20 02:00", "2021-01-20 03:00"))
+
+
+def test_chunks_are_filtered_and_non_empty(export_paths):
+    chunks = list(read_csv_chunks(export_paths[0], step_index=4, chunksize=100))
+    assert chunks and all(len(chunk) for chunk in chunks)
+    assert all((chunk["Step_Index"] == 4).all() for chunk in chunks)
+
+
+def test_empty_result_keeps_the_columns(export_paths):
+    df = read_csv_filtered(export_paths[0], "2030-01-01", "2030-01-02")
+    assert len(df) == 0
+    assert "Current(A)" in df.columns
+
+
+def test_required_columns(export_paths):
+    header = read_header(export_paths[0])
+    assert get_required_columns(header, ["isolate_timeinterval"]) == ["Date_Time"]
+    assert get_required_columns(header, [get_final_SOC, isolate_step_index]) == [
+        "Date_Time", "Test_Time(s)", "Step_Index", "Current(A)",
+        "Aux_Voltage_1(V)", "Aux_Voltage_2(V)", "Aux_Voltage_3(V)", "Aux_Voltage_4(V)"]
+    with pytest.raises(KeyError):
+        get_required_columns(header, ["plot_everything"])
+
+
+def test_projected_read_gives_the_same_results(export_paths, export_frames):
+    functions = [get_final_SOC, isolate_step_index]
+    df = read_csv_for_analysis(export_paths[0], functions, step_index=7)
+    assert "Voltage(V)" not in df.columns and "Data_Point" not in df.columns
+    expected = isolate_step_index(export_frames[0], 7)
+    pd.testing.assert_frame_equal(df, expected[df.columns])
+    pd.testing.assert_frame_equal(get_final_SOC(trim_to_cutoff_voltage(df, 1.95)),
+                                  get_final_SOC(trim_to_cutoff_voltage(expected, 1.95)))
+
+
+def test_detect_date_format():
+    assert detect_date_format(pd.Series(["01/20/2021 13:00:00"])) == "%m/%d/%Y %H:%M:%S"
+    assert detect_date_format(pd.Series(["20.01.2021 13:00:00"])) == "%d.%m.%Y %H:%M:%S"
+    assert detect_date_format(pd.Series(["not a date"])) is None
+
+
+def test_cached_format_is_reused():
+    schema = ("Date_Time",)
+    parse_date_time(pd.Series(["01/20/2021 13:00:00"]), schema)
+    assert loading._date_format_cache[schema] == "%m/%d/%Y %H:%M:%S"
+
+
+@pytest.mark.parametrize("with_test_time", [True, False])
+def test_same_header_with_other_date_format(tmp_path, with_test_time):
+    first, first_index = write_dates(tmp_path / "first.csv", "2021-01-20", "%m/%d/%Y %H:%M:%S",
+                                     with_test_time)
+    second, second_index = write_dates(tmp_path / "second.csv", "2021-01-21", "%Y-%m-%d %H:%M:%S",
+                                       with_test_time)
+    assert read_csv_filtered(first).index.equals(first_index)
+    assert read_csv_filtered(second).index.equals(second_index)
+
+
+def test_missing_timestamps_are_reconstructed(tmp_path):
+    path, index = write_dates(tmp_path / "export.csv", "2021-01-20", "%m/%d/%Y %H:%M:%S")
+    df = pd.read_csv(path)
+    df.loc[[3, 7], "Date_Time"] = np.nan
+    df.to_csv(path, index=False)
+    assert read_csv_filtered(path).index.equals(index)
+
+
+@pytest.mark.parametrize("chunksize", [100, 1000])
+def test_malformed_timestamps_in_later_chunks(tmp_path, chunksize):
+    path, index = write_dates(tmp_path / "export.csv", "2021-01-20", "%m/%d/%Y %H:%M:%S", n_rows=500)
+    df = pd.read_csv(path)
+    df.loc[200:, "Date_Time"] = "##########"
+    df.to_csv(path, index=False)
+    assert read_csv_filtered(path, chunksize=chunksize).index.equals(index)
+    assert read_csv_for_analysis(path, ["isolate_step_index"], chunksize=chunksize).index.equals(index)
+
+
+def test_export_without_date_column(tmp_path):
+    path, index = write_dates(tmp_path / "export.csv", "2021-01-20", "%m/%d/%Y %H:%M:%S", n_rows=500)
+    pd.read_csv(path).drop(columns="Date_Time").to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        read_csv_filtered(path)
+    df = read_csv_filtered(path, chunksize=100, start_time="2021-01-20", columns=["Step_Index"])
+    assert df.index.equals(index)
+    df = read_csv_for_analysis(path, ["isolate_step_index"], step_index=1, chunksize=100,
+                               start_time="2021-01-20")
+    assert df.index.equals(index)
+    assert read_csv_filtered(path, "2030-01-01", "2030-01-02", start_time="2021-01-20",
+                             columns=["Step_Index"]).empty
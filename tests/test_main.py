@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import (get_cutoff_row, get_final_SOC, get_min_cell_voltage, get_nearest_rows,
+                  get_smallest_cap_cell, get_SOC_reference, get_voltage_column_list,
+                  isolate_step_index, soc_from_lut, trim_to_cutoff_voltage)
+
+
+def get_final_SOC_per_cell(df):
+    """The original per-cell implementation of get_final_SOC()."""
+    refdf = get_SOC_reference(df)
+    smallest_cap = get_smallest_cap_cell(df)
+    voltage_cols = get_voltage_column_list(df)
+    soc_list = [soc_from_lut(refdf, df[col].iloc[-1]) for col in voltage_cols]
+    return pd.DataFrame({"SOC (%)": soc_list,
+                         "Capacity (Ah)": [smallest_cap + smallest_cap * soc / 100 for soc in soc_list]},
+                        index=pd.Index([col.replace("Aux_Voltage_", "Cell ").replace("(V)", "")
+                                        for col in voltage_cols], name="Cell ID"))
+
+
+def test_first_crossing_row():
+    min_voltage = np.array([2, 1.9, 1.7, 1.9, 1.7, 1.6, 1.5, 1.9])
+    assert get_cutoff_row(min_voltage, 1.8) == 2
+    assert get_cutoff_row(min_voltage, 1.8, debounce=3) == 4
+    assert get_cutoff_row(min_voltage, 1.0) == len(min_voltage)
+
+
+def test_min_cell_voltage_ignores_missing_values(export_frames):
+    df = export_frames[0].iloc[:3].copy()
+    df.iloc[1, df.columns.get_loc("Aux_Voltage_1(V)")] = np.nan
+    expected = df[[f"Aux_Voltage_{cell}(V)" for cell in range(1, 5)]].min(axis=1).to_numpy()
+    assert np.allclose(get_min_cell_voltage(df), expected)
+
+
+def test_first_crossing_trim_is_a_prefix(export_frames):
+    df = isolate_step_index(export_frames[0], 4)
+    trimmed = trim_to_cutoff_voltage(df, 2.01, first_crossing=True)
+    assert 0 < len(trimmed) < len(df)
+    pd.testing.assert_frame_equal(trimmed, df.iloc[:len(trimmed)])
+    assert (get_min_cell_voltage(trimmed) >= 2.01).all()
+    assert get_min_cell_voltage(df.iloc[[len(trimmed)]])[0] < 2.01
+
+
+def test_first_crossing_removes_recovered_dips(export_frames):
+    df = isolate_step_index(export_frames[0], 1).copy()
+    df.iloc[50, df.columns.get_loc("Aux_Voltage_2(V)")] = 1.5
+    assert len(trim_to_cutoff_voltage(df, 1.9)) == len(df) - 1
+    assert len(trim_to_cutoff_voltage(df, 1.9, first_crossing=True)) == 50
+    assert len(trim_to_cutoff_voltage(df, 1.9, first_crossing=True, debounce=2)) == len(df)
+
+
+@pytest.mark.parametrize("step_index", [1, 4, 13])
+def test_get_final_SOC_equals_per_cell_lookup(export_frames, step_index):
+    df = trim_to_cutoff_voltage(isolate_step_index(export_frames[0], step_index), 1.7)
+    pd.testing.assert_frame_equal(get_final_SOC(df), get_final_SOC_per_cell(df))
+
+
+def test_get_final_SOC_with_missing_final_voltage(export_frames):
+    df = isolate_step_index(export_frames[0], 7).copy()
+    df.iloc[-1, df.columns.get_loc("Aux_Voltage_3(V)")] = np.nan
+    soc_df = get_final_SOC(df)
+    assert np.isnan(soc_df.loc["Cell 3", "SOC (%)"])
+    pd.testing.assert_frame_equal(soc_df.drop(index="Cell 3"),
+                                  get_final_SOC_per_cell(df).drop(index="Cell 3"))
+
+
+def test_get_nearest_rows_equals_argmin():
+    rng = np.random.default_rng(0)
+    for trial in range(500):
+        reference = rng.integers(0, 10, rng.integers(1, 30)).astype(float) / 4
+        if trial % 3 == 0:
+            reference[rng.random(len(reference)) < 0.2] = np.nan
+        values = rng.integers(-2, 45, 8) / 16
+        rows = get_nearest_rows(reference, values)
+        for value, row in zip(values, rows):
+            if np.isnan(reference).all():
+                assert row == -1
+            else:
+                assert row == np.argmin(abs(pd.Series(reference) - value))
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from merging import (drop_duplicate_samples, exports_overlap, get_overlap_intervals,
+                     merge_exports, merge_exports_deduplicated)
+
+
+def make_frame(start, n_rows, freq="1s"):
+    index = pd.date_range(start, periods=n_rows, freq=freq, tz="UTC", name="Date_Time")
+    return pd.DataFrame({"Step_Index": 1, "Value": np.arange(n_rows, dtype=float)}, index=index)
+
+
+def test_merge_exports_equals_sort(export_frames):
+    expected = pd.concat(export_frames).sort_index(kind="stable")
+    merged = merge_exports(export_frames)
+    pd.testing.assert_frame_equal(merged, expected, check_freq=False)
+
+
+def test_merge_exports_concatenates_disjoint_exports():
+    first, second = make_frame("2021-01-01", 10), make_frame("2021-01-02", 10)
+    assert not exports_overlap([first, second])
+    pd.testing.assert_frame_equal(merge_exports([second, first]), pd.concat([first, second]))
+
+
+def test_merge_exports_with_equal_start_times():
+    longer, single = make_frame("2021-01-01", 5), make_frame("2021-01-01", 1)
+    merged = merge_exports([longer, single])
+    assert merged.index.is_monotonic_increasing
+    assert len(merged) == 6
+
+
+def test_merge_exports_rejects_unsorted():
+    with pytest.raises(ValueError):
+        merge_exports([make_frame("2021-01-01", 10).iloc[::-1], make_frame("2021-01-01", 5)])
+
+
+def test_get_overlap_intervals():
+    frames = [make_frame("2021-01-01 00:00:00", 501), make_frame("2021-01-01 00:08:20", 500),
+              make_frame("2021-01-01 00:05:00", 10), make_frame("2021-01-02", 3)]
+    assert get_overlap_intervals(frames) == [
+        (pd.Timestamp("2021-01-01 00:05:00", tz="UTC"), pd.Timestamp("2021-01-01 00:05:09", tz="UTC")),
+        (pd.Timestamp("2021-01-01 00:08:20", tz="UTC"), pd.Timestamp("2021-01-01 00:08:20", tz="UTC"))]
+
+
+def test_deduplication_is_limited_to_the_overlap():
+    first = make_frame("2021-01-01 00:00:00", 501)
+    second = make_frame("2021-01-01 00:08:20", 500)
+    merged, removed = merge_exports_deduplicated([first, second], subset=["Step_Index"],
+                                                 time_tolerance="1s")
+    assert removed == 1
+    assert len(merged) == 1000
+
+
+def test_deduplication_of_identical_exports():
+    df = make_frame("2021-01-01", 100)
+    merged, removed = merge_exports_deduplicated([df, df.copy()])
+    assert removed == 100
+    pd.testing.assert_frame_equal(merged, df, check_freq=False)
+
+
+def test_disjoint_exports_are_not_deduplicated():
+    merged, removed = merge_exports_deduplicated([make_frame("2021-01-01", 10),
+                                                  make_frame("2021-01-02", 10)])
+    assert removed == 0
+    assert len(merged) == 20
+
+
+def test_duplicates_are_compared_with_the_last_kept_sample():
+    df = make_frame("2021-01-01", 10)
+    df["Value"] = np.arange(10) * 0.4
+    deduplicated, removed = drop_duplicate_samples(df, ["Value"], "10s", 0.5)
+    assert removed == 5
+    assert deduplicated["Value"].tolist() == pytest.approx([0.0, 0.8, 1.6, 2.4, 3.2])
+
+
+def drop_duplicate_samples_sequentially(df, subset, time_tolerance, value_atol):
+    """Compares every row with the last kept row, as in the definition."""
+    keys, values = df.index.asi8, df[subset].to_numpy(dtype=float)
+    keep, kept = [0], 0
+    for row in range(1, len(df)):
+        if not (keys[row] - keys[kept] <= pd.Timedelta(time_tolerance).value
+                and np.all(np.isclose(values[row], values[kept], rtol=0, atol=value_atol,
+                                      equal_nan=True))):
+            keep.append(row)
+            kept = row
+    return df.iloc[keep]
+
+
+@pytest.mark.parametrize("time_tolerance, value_atol", [("0s", 0), ("2s", 0), ("0s", 1), ("3s", 1)])
+def test_deduplication_equals_sequential_comparison(time_tolerance, value_atol):
+    rng = np.random.default_rng(0)
+    index = pd.DatetimeIndex(np.sort(rng.integers(0, 100, 400)) * 10**9, tz="UTC", name="Date_Time")
+    df = pd.DataFrame({"Step_Index": rng.integers(1, 3, 400),
+                       "Value": rng.integers(0, 4, 400).astype(float)}, index=index)
+    df.loc[rng.random(400) < 0.1, "Value"] = np.nan
+    deduplicated, removed = drop_duplicate_samples(df, None, time_tolerance, value_atol)
+    expected = drop_duplicate_samples_sequentially(df, list(df.columns), time_tolerance, value_atol)
+    assert removed == len(df) - len(expected) > 0
+    pd.testing.assert_frame_equal(deduplicated, expected)
+
+
+def test_exact_duplicates_compare_all_columns():
+    df = make_frame("2021-01-01", 4)
+    df.index = df.index[[0, 0, 0, 0]]
+    df["Value"] = [1.0, 1.0, 2.0, 2.0]
+    df["Name"] = ["a", "b", "b", "b"]
+    deduplicated, removed = drop_duplicate_samples(df)
+    assert removed == 1
+    assert deduplicated["Name"].tolist() == ["a", "b", "b"]
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from dataset import PartitionedDataset, write_partitioned_dataset
+from main import get_final_SOC, isolate_step_index_in_timeinterval, trim_to_cutoff_voltage
+from merging import merge_exports
+from outofcore import (csv_chunk_source, dataset_chunk_source, get_chunk_rows,
+                       get_final_SOC_out_of_core)
+
+
+@pytest.fixture
+def history(export_frames):
+    return merge_exports(export_frames)
+
+
+def test_chunk_rows():
+    assert get_chunk_rows(9, 24_000) == 100
+    assert get_chunk_rows(9, 1) == 1
+
+
+@pytest.mark.parametrize("step_index, cutoff_voltage", [(4, None), (4, 2.01), (1, 2.07)])
+def test_out_of_core_SOC_from_csv(export_paths, export_frames, step_index, cutoff_voltage):
+    df = isolate_step_index_in_timeinterval(export_frames[0], "2021-01-20", "2021-01-20", step_index)
+    if cutoff_voltage is not None:
+        df = trim_to_cutoff_voltage(df, cutoff_voltage)
+    source = csv_chunk_source(export_paths[0], "2021-01-20", "2021-01-20", step_index,
+                              memory_limit=20_000)
+    pd.testing.assert_frame_equal(get_final_SOC_out_of_core(source, cutoff_voltage), get_final_SOC(df))
+
+
+def test_out_of_core_SOC_from_dataset(tmp_path, history):
+    write_partitioned_dataset(history, str(tmp_path / "ds"), "ch", freq="D")
+    df = trim_to_cutoff_voltage(
+        isolate_step_index_in_timeinterval(history, "2021-01-20", "2021-01-21", 7), 1.95)
+    source = dataset_chunk_source(PartitionedDataset(str(tmp_path / "ds")), "ch",
+                                  "2021-01-20", "2021-01-21", 7, memory_limit=30_000)
+    pd.testing.assert_frame_equal(get_final_SOC_out_of_core(source, 1.95), get_final_SOC(df))
@@ -0,0 +1,30 @@
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+from loading import read_csv_filtered
+from parallel import load_exports_merged, load_exports_parallel
+
+
+def get_shared_memory_blocks():
+    return set(glob.glob("/dev/shm/psm_*"))
+
+
+def test_load_exports_parallel(export_paths):
+    frames = load_exports_parallel(export_paths, max_workers=2, memory_budget=1)
+    assert list(frames) == export_paths
+    for path, df in frames.items():
+        pd.testing.assert_frame_equal(df, read_csv_filtered(path))
+    assert load_exports_merged(export_paths, max_workers=2).index.is_monotonic_increasing
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm")
+def test_failing_export_releases_shared_memory(tmp_path, export_paths):
+    bad_path = tmp_path / "bad.csv"
+    bad_path.write_text('x\n"unterminated\n')
+    before = get_shared_memory_blocks()
+    with pytest.raises(Exception):
+        load_exports_parallel(export_paths[:2] + [str(bad_path)] + export_paths[2:], max_workers=4)
+    assert get_shared_memory_blocks() - before == set()
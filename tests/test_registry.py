@@ -0,0 +1,79 @@
+import json
+
+import pandas as pd
+import pytest
+
+import registry
+from loading import get_required_columns
+from main import get_voltage_column_list
+from registry import (SchemaRegistry, canonicalize_columns, get_canonical_names, get_cell_ids,
+                      get_default_registry, match_header, set_default_registry)
+
+VARIANT_HEADER = ["Data Point", "Date Time", "Test Time (s)", "Current (A)", "Step Index",
+                  "Aux Voltage 1 (V)", "Aux_Volt_2(V)", "Aux Temperature 1 (C)"]
+
+
+@pytest.fixture(autouse=True)
+def restore_default_registry():
+    default = registry.default_registry
+    yield
+    registry.default_registry = default
+
+
+def test_variant_spellings_are_canonicalized():
+    df = canonicalize_columns(pd.DataFrame(columns=VARIANT_HEADER))
+    assert list(df.columns) == ["Data Point", "Date_Time", "Test_Time(s)", "Current(A)",
+                                "Step_Index", "Aux_Voltage_1(V)", "Aux_Voltage_2(V)",
+                                "Aux_Temperature_1(C)"]
+    schema = match_header(VARIANT_HEADER)
+    assert schema["time"] == "Date Time"
+    assert schema["cell_voltages"] == ["Aux Voltage 1 (V)", "Aux_Volt_2(V)"]
+    assert schema["temperatures"] == ["Aux Temperature 1 (C)"]
+
+
+def test_registry_json_round_trip(tmp_path):
+    path = str(tmp_path / "registry.json")
+    first = SchemaRegistry(path)
+    schema = first.lookup(VARIANT_HEADER)
+    with open(path) as file:
+        assert len(json.load(file)) == 1
+    second = SchemaRegistry(path)
+    assert second.lookup(VARIANT_HEADER) == schema
+
+
+def test_corrected_mapping_is_used(tmp_path):
+    path = str(tmp_path / "registry.json")
+    SchemaRegistry(path).lookup(VARIANT_HEADER)
+    with open(path) as file:
+        mappings = json.load(file)
+    schema = next(iter(mappings.values()))
+    schema["canonical"]["Data Point"] = "Data_Point"
+    with open(path, "w") as file:
+        json.dump(mappings, file)
+    assert get_canonical_names(VARIANT_HEADER, SchemaRegistry(path))["Data Point"] == "Data_Point"
+
+
+def test_set_default_registry(tmp_path):
+    path = str(tmp_path / "registry.json")
+    default = set_default_registry(path)
+    assert get_default_registry() is default
+    get_required_columns(VARIANT_HEADER, ["get_final_SOC"])
+    get_voltage_column_list(pd.DataFrame(columns=VARIANT_HEADER))
+    assert SchemaRegistry(path).lookup(VARIANT_HEADER) == default.lookup(VARIANT_HEADER)
+
+
+def test_cell_ids_are_not_stored(tmp_path):
+    default = set_default_registry(str(tmp_path / "registry.json"))
+    voltage_cols = ["Aux Voltage 1 (V)", "Aux_Volt_2(V)", "Aux_Voltage_3(V)", "My_Aux_Voltage_X"]
+    assert get_cell_ids(voltage_cols) == ["Cell 1", "Cell 2", "Cell 3", "My_Cell X"]
+    assert default._by_fingerprint == {}
+    assert not (tmp_path / "registry.json").exists()
+
+
+def test_required_columns_agree_with_voltage_columns():
+    header = ["Data_Point", "Date_Time", "Test_Time(s)", "Current(A)", "Step_Index",
+              "Aux Voltage 1 (V)", "Aux_Voltage_2(V)", "Aux_Temperature_1(C)"]
+    required = get_required_columns(header, ["get_final_SOC"])
+    assert required == ["Date_Time", "Test_Time(s)", "Current(A)",
+                        "Aux Voltage 1 (V)", "Aux_Voltage_2(V)"]
+    assert set(get_voltage_column_list(pd.DataFrame(columns=header))) <= set(required)
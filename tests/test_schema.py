@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from main import isolate_step_index, trim_to_cutoff_voltage
+from schema import check_compact_results, compact_dtypes, get_memory_saving
+
+
+def test_compact_dtypes(export_frames):
+    df = export_frames[0]
+    compact = compact_dtypes(df)
+    assert compact["Aux_Voltage_1(V)"].dtype == np.float32
+    assert compact["Current(A)"].dtype == np.float32
+    assert compact["Step_Index"].dtype == np.int8
+    assert compact["Test_Time(s)"].dtype == np.float64
+    assert str(compact.index.tz) == "UTC"
+    assert df["Current(A)"].dtype == np.float64  # the input is not changed
+
+
+def test_compact_date_column(export_frames):
+    df = export_frames[0].reset_index()
+    df["Date_Time"] = df["Date_Time"].dt.tz_localize(None)
+    compact = compact_dtypes(df)
+    assert str(compact["Date_Time"].dt.tz) == "UTC"
+
+
+def test_memory_saving(export_frames):
+    df = export_frames[0]
+    report = get_memory_saving(df, compact_dtypes(df))
+    assert report.loc["Aux_Voltage_1(V)", "Saved (B)"] == len(df) * 4
+    assert report.loc["Total", "Saved (B)"] > 0
+
+
+def test_compact_results_match(export_frames):
+    df = trim_to_cutoff_voltage(isolate_step_index(export_frames[0], 7), 1.95)
+    assert check_compact_results(df, compact_dtypes(df))
+
+
+def test_compact_results_mismatch(export_frames):
+    df = trim_to_cutoff_voltage(isolate_step_index(export_frames[0], 7), 1.95)
+    shifted = compact_dtypes(df)
+    shifted["Current(A)"] *= 1.1
+    assert not check_compact_results(df, shifted)
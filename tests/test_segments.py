@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import get_capacity_list, isolate_step_index
+from merging import merge_exports
+from segments import detect_discharge_segments, get_history_capacity_list, get_segment_frames
+
+
+@pytest.fixture
+def history(export_frames):
+    return merge_exports([export_frames[0], export_frames[2]])
+
+
+def test_discharge_steps_are_detected(export_frames):
+    segments = detect_discharge_segments(export_frames[0], min_duration=1000)
+    assert segments["step_index"].tolist() == [1, 4, 7, 10, 13, 16, 19]
+    assert np.allclose(segments["current(A)"], -2.0)
+    assert np.allclose(segments["duration(s)"], 1990.0)
+    assert (segments["min_voltage(V)"] < segments["start_voltage(V)"]).all()
+
+
+def test_segment_filters(export_frames):
+    df = export_frames[0]
+    assert detect_discharge_segments(df).empty  # every run is shorter than an hour
+    assert detect_discharge_segments(df, min_current=3, min_duration=1000).empty
+    segments = detect_discharge_segments(df, min_duration=1000, cutoff_voltage=1.9)
+    assert segments["step_index"].tolist() == [10, 13, 16, 19]
+
+    noisy = df.copy()
+    noisy.loc[isolate_step_index(df, 4).index[::2], "Current(A)"] = -1.0
+    assert 4 not in detect_discharge_segments(noisy, min_duration=1000)["step_index"].tolist()
+
+
+def test_segments_of_a_history(history):
+    segments = detect_discharge_segments(history, min_duration=1000, cutoff_voltage=2.01)
+    assert segments["step_index"].tolist() == [4, 7, 10, 13, 16, 19] * 2
+    frames = get_segment_frames(history, segments)
+    assert all((frame["Step_Index"] == step).all()
+               for frame, step in zip(frames, segments["step_index"]))
+    pd.testing.assert_frame_equal(frames[0], isolate_step_index(history.iloc[:4000], 4))
+    capacities = get_history_capacity_list(history, min_duration=1000, cutoff_voltage=2.01)
+    pd.testing.assert_frame_equal(capacities, get_capacity_list(frames))
+
+
+def test_empty_history(export_frames):
+    segments = detect_discharge_segments(export_frames[0].iloc[:0])
+    assert segments.empty and "min_voltage(V)" in segments.columns
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from main import isolate_step_index, isolate_step_index_in_timeinterval
+from merging import merge_exports
+from steps import StepRunIndex, batch_isolate_step_index_in_timeinterval, get_step_runs
+
+
+@pytest.fixture
+def history(export_frames):
+    return merge_exports([export_frames[0], export_frames[2]])
+
+
+def test_step_runs(export_frames):
+    runs = get_step_runs(export_frames[0])
+    assert len(runs) == 20
+    assert runs["step_index"].tolist() == list(range(1, 21))
+    assert (runs["stop_row"] - runs["start_row"] == 200).all()
+    assert (runs["occurrence"] == 0).all()
+    assert runs["start_time"].iloc[1] == export_frames[0].index[200].value
+
+
+@pytest.mark.parametrize("step_index", [1, 4, 20, 99])
+def test_step_run_index_equals_main(history, step_index):
+    index = StepRunIndex(history)
+    pd.testing.assert_frame_equal(index.isolate_step_index(step_index),
+                                  isolate_step_index(history, step_index))
+    pd.testing.assert_frame_equal(
+        index.isolate_step_index_in_timeinterval("2021-01-20 02:00", "2021-01-21 02:00", step_index),
+        isolate_step_index_in_timeinterval(history, "2021-01-20 02:00", "2021-01-21 02:00",
+                                           step_index))
+
+
+def test_single_occurrences(history):
+    index = StepRunIndex(history)
+    assert index.get_runs(4)["occurrence"].tolist() == [0, 1]
+    first, last = index.isolate_step_index(4, 0), index.isolate_step_index(4, -1)
+    pd.testing.assert_frame_equal(pd.concat([first, last]), isolate_step_index(history, 4))
+    assert len(index.isolate_step_index(4, 2)) == 0
+
+
+def test_step_run_index_rejects_unsorted_data(history):
+    shuffled = history.iloc[::-1]
+    with pytest.raises(ValueError):
+        StepRunIndex(shuffled).isolate_step_index_in_timeinterval("2021-01-20", "2021-01-21", 4)
+    index = StepRunIndex(shuffled, sort=True)
+    pd.testing.assert_frame_equal(index.isolate_step_index(4), isolate_step_index(history, 4))
+
+
+def test_batch_isolation_equals_single_queries(history):
+    queries = [("2021-01-20", "2021-01-20", 4), ("2021-01-20", "2021-01-21", 1),
+               ("2021-01-21", "2021-01-22", 16), ("2021-01-20", "2021-01-22", 99)]
+    results = batch_isolate_step_index_in_timeinterval(history, queries)
+    assert len(results) == len(queries)
+    for query, result in zip(queries, results):
+        pd.testing.assert_frame_equal(result, isolate_step_index_in_timeinterval(history, *query))
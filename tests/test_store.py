@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from main import isolate_step_index, isolate_step_index_in_timeinterval, isolate_timeinterval
+from store import ArrayStore, write_array_store
+
+
+def concat_views(views, columns):
+    return pd.concat([view.to_frame(columns) for view in views])
+
+
+def test_store_round_trip(tmp_path, export_frames):
+    df = export_frames[0]
+    store = write_array_store(df, str(tmp_path / "store"))
+    reopened = ArrayStore(str(tmp_path / "store"))
+    assert len(reopened) == len(df)
+    pd.testing.assert_frame_equal(reopened.isolate_timeinterval(None, None).to_frame(), df,
+                                  check_freq=False)
+    assert isinstance(store.column("Current(A)"), np.memmap)
+
+
+def test_unsorted_frame_is_sorted_while_writing(tmp_path, export_frames):
+    df = export_frames[0]
+    store = write_array_store(df.iloc[::-1], str(tmp_path / "store"))
+    assert (np.diff(store.timestamps) >= 0).all()
+    pd.testing.assert_frame_equal(store.isolate_timeinterval(None, None).to_frame(), df,
+                                  check_freq=False)
+
+
+def test_time_interval_view(tmp_path, export_frames):
+    df = export_frames[0]
+    store = write_array_store(df, str(tmp_path / "store"))
+    view = store.isolate_timeinterval("2021-01-20 02:00", "2021-01-20 03:00")
+    expected = isolate_timeinterval(df, "2021-01-20 02:00", "2021-01-20 03:00")
+    assert len(view) == len(expected)
+    pd.testing.assert_frame_equal(view.to_frame(list(df.columns)), expected, check_freq=False)
+
+
+def test_step_index_views(tmp_path, export_frames):
+    df = pd.concat([export_frames[0], export_frames[2]])
+    store = write_array_store(df, str(tmp_path / "store"))
+    views = store.isolate_step_index(4)
+    assert len(views) == 2  # one view per contiguous run
+    pd.testing.assert_frame_equal(concat_views(views, list(df.columns)),
+                                  isolate_step_index(df, 4), check_freq=False)
+
+
+def test_step_index_views_in_time_interval(tmp_path, export_frames):
+    df = pd.concat([export_frames[0], export_frames[2]])
+    store = write_array_store(df, str(tmp_path / "store"))
+    views = store.isolate_step_index_in_timeinterval("2021-01-21", "2021-01-21", 7)
+    expected = isolate_step_index_in_timeinterval(df, "2021-01-21", "2021-01-21", 7)
+    assert len(views) == 1
+    pd.testing.assert_frame_equal(concat_views(views, list(df.columns)), expected,
+                                  check_freq=False)
+    assert store.isolate_step_index_in_timeinterval("2030-01-01", "2030-01-02", 7) == []
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from main import (get_cutoff_row, get_final_SOC, get_min_cell_voltage, isolate_step_index,
+                  trim_to_cutoff_voltage)
+from sweep import get_cutoff_rows, sweep_cutoff_voltages
+
+
+def test_cutoff_rows_equal_single_lookups():
+    rng = np.random.default_rng(0)
+    for trial in range(200):
+        min_voltage = np.round(2 - np.cumsum(rng.normal(0.01, 0.02, rng.integers(0, 40))), 2)
+        if trial % 4 == 0 and len(min_voltage):
+            min_voltage[rng.random(len(min_voltage)) < 0.2] = np.nan
+        cutoff_voltages = list(rng.uniform(1.6, 2.1, 5))
+        for debounce in (1, 3):
+            assert list(get_cutoff_rows(min_voltage, cutoff_voltages, debounce)) == [
+                get_cutoff_row(min_voltage, cutoff, debounce) for cutoff in cutoff_voltages]
+
+
+@pytest.mark.parametrize("debounce", [1, 3])
+def test_sweep_equals_trim_and_get_final_SOC(export_frames, debounce):
+    df = isolate_step_index(export_frames[0], 16)
+    cutoff_voltages = [1.775, 1.77, 1.78, 1.765, 2.5, 1.0]
+    result = sweep_cutoff_voltages(df, cutoff_voltages, debounce)
+    min_voltage = get_min_cell_voltage(df)
+    assert list(get_cutoff_rows(min_voltage, cutoff_voltages, debounce)) == [
+        get_cutoff_row(min_voltage, cutoff_voltage, debounce) for cutoff_voltage in cutoff_voltages]
+    for cutoff_voltage in cutoff_voltages:
+        trimmed = trim_to_cutoff_voltage(df, cutoff_voltage, first_crossing=True, debounce=debounce)
+        if len(trimmed) == 0:
+            assert result.loc[cutoff_voltage].isna().all().all()
+            continue
+        expected = get_final_SOC(trimmed)
+        np.testing.assert_allclose(result.loc[cutoff_voltage].to_numpy(), expected.to_numpy(),
+                                   rtol=1e-12)
+        assert list(result.loc[cutoff_voltage].index) == list(expected.index)
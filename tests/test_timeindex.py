@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from main import isolate_timeinterval
+from merging import merge_exports
+from timeindex import SortedTimeIndex
+
+
+@pytest.fixture
+def history(export_frames):
+    return merge_exports(export_frames)
+
+
+@pytest.mark.parametrize("start_date, stop_date", [
+    ("2021-01-20", "2021-01-20"), ("2021-01-20 08:00", "2021-01-21 03:30:05"),
+    ("2021-01-19", "2021-01-19"), ("2021-01-21 12:00", "2030-01-01")])
+def test_isolation_equals_main(history, start_date, stop_date):
+    index = SortedTimeIndex(history)
+    pd.testing.assert_frame_equal(index.isolate_timeinterval(start_date, stop_date),
+                                  isolate_timeinterval(history, start_date, stop_date))
+
+
+def test_open_bounds(history):
+    index = SortedTimeIndex(history)
+    assert index.get_row_range(None, None) == slice(0, len(history))
+    assert index.get_row_range("2021-01-21", None).stop == len(history)
+
+
+def test_unsorted_data(history):
+    shuffled = history.sample(frac=1, random_state=0)
+    index = SortedTimeIndex(shuffled)
+    assert not index.is_sorted
+    with pytest.raises(ValueError):
+        index.isolate_timeinterval("2021-01-20", "2021-01-20")
+    index = SortedTimeIndex(shuffled, sort=True)
+    pd.testing.assert_frame_equal(index.isolate_timeinterval("2021-01-20", "2021-01-20"),
+                                  isolate_timeinterval(shuffled.sort_index(kind="stable"),
+                                                       "2021-01-20", "2021-01-20"))
@@ -1,4 +1,5 @@
 from main import *
+from merging import merge_exports
 import pandas as pd
 
 
@@ -13,8 +14,7 @@ df2["Date_Time"] = pd.to_datetime(df2["Date_Time"], utc=True)
 df3 = pd.read_csv(
     "/Users/philipphematty/Downloads/Philipp/Messdaten/BMS/Gel_noBMS_Cycle_02_Summer_Channel_3_Wb_1.CSV", parse_dates=True)
 df3["Date_Time"] = pd.to_datetime(df3["Date_Time"], utc=True)
-dfx = df1.append(df2).append(df3).sort_values(by="Date_Time")
-dfx = dfx.set_index(["Date_Time"])
+dfx = merge_exports([df.set_index("Date_Time") for df in (df1, df2, df3)])
 
 dfx2 = dfx
 
@@ -0,0 +1,76 @@
+from pandas import DataFrame
+from typing import Optional
+import numpy as np
+
+from loading import get_interval_bounds
+from merging import get_time_keys
+
+
+class SortedTimeIndex:
+    """Positional time index of a DataFrame with a DateTime index. Whether
+    the rows are sorted by time is checked once when the index is built.
+    Interval isolation then uses a binary search on the int64 timestamps
+    and returns positional slices, instead of relying on pandas label
+    slicing, which is slow or fails on unsorted data.
+
+    Args:
+        df (DataFrame): DataFrame with a DateTime index
+        sort (bool): sort unsorted data once by time (stable) instead of
+            raising an error when an interval is isolated
+    """
+
+    def __init__(self, df: DataFrame, sort: bool = False) -> None:
+        keys = get_time_keys(df)
+        self.is_sorted = bool(len(keys) < 2 or (keys[1:] >= keys[:-1]).all())
+        if not self.is_sorted and sort:
+            order = np.argsort(keys, kind="stable")
+            df = df.iloc[order]
+            keys = keys[order]
+            self.is_sorted = True
+        self.df = df
+        self.keys = keys
+
+    def _check_sorted(self) -> None:
+        if not self.is_sorted:
+            raise ValueError("The DataFrame is not sorted by its DateTime index. "
+                             "Use merge_exports() to combine exports or build the "
+                             "index with sort=True.")
+
+    def get_row_range(
+            self,
+            start_date: Optional[str],
+            stop_date: Optional[str]) -> slice:
+        """Finds the rows within a time interval by binary search.
+
+        Args:
+            start_date (str, optional): start date for interval
+            stop_date (str, optional): stop date for interval
+
+        Raises:
+            ValueError: if the data is not sorted by time
+
+        Returns:
+            slice: positional row range
+        """
+        self._check_sorted()
+        start, stop = get_interval_bounds(start_date, stop_date)
+        start_row = 0 if start is None else int(np.searchsorted(self.keys, start.value, side="left"))
+        stop_row = len(self.keys) if stop is None else int(
+            np.searchsorted(self.keys, stop.value, side="right"))
+        return slice(start_row, max(start_row, stop_row))
+
+    def isolate_timeinterval(self, start_date: Optional[str], stop_date: Optional[str]) -> DataFrame:
+        """Isolates a time interval like isolate_timeinterval() in main.py,
+        as a positional slice of the DataFrame.
+
+        Args:
+            start_date (str, optional): start date for interval
+            stop_date (str, optional): stop date for interval
+
+        Raises:
+            ValueError: if the data is not sorted by time
+
+        Returns:
+            DataFrame: Isolated time interval
+        """
+        return self.df.iloc[self.get_row_range(start_date, stop_date)]